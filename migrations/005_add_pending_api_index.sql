@@ -0,0 +1,14 @@
+-- Migration 005: Add partial index for the pending API post queue
+-- Date: 2026-10-18
+-- Issue: get_pending_api_posts() searches idx_runs_api_posted and then sorts
+--        every unposted row in a temp B-tree to apply ORDER BY start_time DESC
+
+-- Index for: WHERE api_posted = 0 ... ORDER BY start_time DESC LIMIT ?
+-- Only unposted rows are indexed, so it stays small as runs are posted.
+CREATE INDEX IF NOT EXISTS idx_runs_pending_api
+ON agent_runs(api_posted, start_time) WHERE api_posted = 0;
+
+-- Verify index was created
+SELECT name, sql FROM sqlite_master
+WHERE type='index' AND tbl_name='agent_runs'
+AND name = 'idx_runs_pending_api';
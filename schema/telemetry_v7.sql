@@ -110,6 +110,7 @@ CREATE INDEX IF NOT EXISTS idx_runs_agent_created ON agent_runs(agent_name, crea
 CREATE INDEX IF NOT EXISTS idx_runs_job_type ON agent_runs(job_type);
 CREATE INDEX IF NOT EXISTS idx_runs_parent_run ON agent_runs(parent_run_id);
 CREATE INDEX IF NOT EXISTS idx_runs_api_posted ON agent_runs(api_posted);
+CREATE INDEX IF NOT EXISTS idx_runs_pending_api ON agent_runs(api_posted, start_time) WHERE api_posted = 0;
 CREATE INDEX IF NOT EXISTS idx_runs_insight ON agent_runs(insight_id);
 CREATE INDEX IF NOT EXISTS idx_runs_commit ON agent_runs(git_commit_hash);
 CREATE INDEX IF NOT EXISTS idx_runs_website ON agent_runs(website);
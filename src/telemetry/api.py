@@ -5,6 +5,7 @@ Posts telemetry data to Google Sheets API with exponential backoff retry.
 """
 
 import os
+import threading
 import time
 import logging
 from typing import Dict, Any, Optional
@@ -95,6 +96,25 @@ class APIClient:
         # Generate exponential backoff delays dynamically
         self.retry_delays = [2**i for i in range(max_retries)]  # 1s, 2s, 4s, 8s...
 
+        # One httpx.Client, created on first use and reused for every request,
+        # so repeat posts keep the TCP/TLS connection alive
+        self._http_client = None
+        self._http_client_lock = threading.Lock()
+
+    def _get_http_client(self):
+        """Return the shared httpx.Client, creating it on first use."""
+        with self._http_client_lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(timeout=self.timeout)
+            return self._http_client
+
+    def close(self):
+        """Close the shared HTTP connection pool. Safe to call more than once."""
+        with self._http_client_lock:
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+
     def is_configured(self) -> bool:
         """
         Check if API client is properly configured.
@@ -159,48 +179,48 @@ class APIClient:
 
         for attempt in range(self.max_retries):
             try:
-                with httpx.Client(timeout=self.timeout) as client:
-                    response = client.post(
-                        self.api_url,
-                        json=payload_dict,
-                        headers=headers,
-                    )
-
-                    # Check response status
-                    if response.status_code == 200:
-                        return True, f"[OK] Posted to API (attempt {attempt + 1})"
-                    else:
-                        # Use smart retry logic
-                        last_error = f"HTTP {response.status_code}"
+                client = self._get_http_client()
+                response = client.post(
+                    self.api_url,
+                    json=payload_dict,
+                    headers=headers,
+                )
+
+                # Check response status
+                if response.status_code == 200:
+                    return True, f"[OK] Posted to API (attempt {attempt + 1})"
+                else:
+                    # Use smart retry logic
+                    last_error = f"HTTP {response.status_code}"
 
-                        if should_retry(response=response):
-                            # Retryable error (5xx server error)
-                            if attempt < self.max_retries - 1:
-                                delay = self.retry_delays[attempt]
-                                logger.warning(
-                                    f"API error {response.status_code} (retryable), "
-                                    f"attempt {attempt + 1}/{self.max_retries}, "
-                                    f"retrying in {delay}s"
-                                )
-                                time.sleep(delay)
-                                continue
-                            else:
-                                logger.error(
-                                    f"API error {response.status_code} failed after {self.max_retries} attempts"
-                                )
-                                return (
-                                    False,
-                                    f"[FAIL] API post failed after {self.max_retries} attempts: {last_error}",
-                                )
-                        else:
-                            # Non-retryable error (4xx client error)
+                    if should_retry(response=response):
+                        # Retryable error (5xx server error)
+                        if attempt < self.max_retries - 1:
+                            delay = self.retry_delays[attempt]
                             logger.warning(
-                                f"API error {response.status_code} (client error, not retrying)"
+                                f"API error {response.status_code} (retryable), "
+                                f"attempt {attempt + 1}/{self.max_retries}, "
+                                f"retrying in {delay}s"
+                            )
+                            time.sleep(delay)
+                            continue
+                        else:
+                            logger.error(
+                                f"API error {response.status_code} failed after {self.max_retries} attempts"
                             )
                             return (
                                 False,
-                                f"[FAIL] API client error {response.status_code} (not retried)",
+                                f"[FAIL] API post failed after {self.max_retries} attempts: {last_error}",
                             )
+                    else:
+                        # Non-retryable error (4xx client error)
+                        logger.warning(
+                            f"API error {response.status_code} (client error, not retrying)"
+                        )
+                        return (
+                            False,
+                            f"[FAIL] API client error {response.status_code} (not retried)",
+                        )
 
             except httpx.TimeoutException as e:
                 last_error = "Request timeout"
@@ -405,17 +425,16 @@ class APIClient:
             return False, "[FAIL] httpx not installed"
 
         try:
-            with httpx.Client(timeout=5.0) as client:
-                # Simple GET request to check connectivity
-                response = client.get(self.api_url)
-
-                if response.status_code in (200, 405):  # 405 = Method Not Allowed is OK
-                    return True, "[OK] API endpoint reachable"
-                else:
-                    return (
-                        False,
-                        f"[FAIL] API returned status {response.status_code}",
-                    )
+            # Simple GET request to check connectivity
+            response = self._get_http_client().get(self.api_url, timeout=5.0)
+
+            if response.status_code in (200, 405):  # 405 = Method Not Allowed is OK
+                return True, "[OK] API endpoint reachable"
+            else:
+                return (
+                    False,
+                    f"[FAIL] API returned status {response.status_code}",
+                )
 
         except Exception as e:
             return False, f"[FAIL] API connection test failed: {e}"
@@ -54,12 +54,18 @@ class BufferFile:
 
     def _init_active_file(self):
         """Initialize by finding existing .active file or creating new one."""
-        # Look for existing .active file
-        active_files = list(self.buffer_dir.glob("*.jsonl.active"))
+        # Look for existing .active file (scandir entries carry their own stat,
+        # so no Path objects or glob pattern matching are needed)
+        with os.scandir(self.buffer_dir) as entries:
+            active_files = [
+                entry for entry in entries
+                if entry.name.endswith(".jsonl.active") and entry.is_file()
+            ]
 
         if active_files:
             # Use most recent active file
-            self.current_file = sorted(active_files, key=lambda p: p.stat().st_mtime)[-1]
+            newest = max(active_files, key=lambda entry: entry.stat().st_mtime)
+            self.current_file = Path(newest.path)
             print(f"[OK] Using existing buffer: {self.current_file.name}")
         else:
             # Create new active file
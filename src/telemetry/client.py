@@ -7,6 +7,7 @@ TelemetryClient provides the public API for agent telemetry instrumentation.
 import json
 import logging
 import platform
+import re
 import threading
 from contextlib import contextmanager
 from typing import Optional, Dict, Any
@@ -19,6 +20,10 @@ logger = logging.getLogger(__name__)
 # a practical limit for file system compatibility and performance
 MAX_RUN_ID_LENGTH = 255
 
+# Characters never allowed in a custom run_id (path separators, null byte);
+# matched in a single pass instead of one substring scan per character
+_RUN_ID_INVALID_CHARS_RE = re.compile(r"[/\\\x00]")
+
 from .config import TelemetryConfig
 from .models import (
     RunRecord,
@@ -306,7 +311,10 @@ class TelemetryClient:
         logger.debug("Run ID metrics initialized")
 
         # Git detector (GT-01: automatic git context detection)
-        self.git_detector = GitDetector(auto_detect=True)
+        # Context is also cached under metrics_dir so later processes skip git
+        self.git_detector = GitDetector(
+            auto_detect=True, cache_dir=self.config.metrics_dir / "cache"
+        )
         logger.debug("Git detector initialized")
 
         # Log active clients summary
@@ -479,7 +487,7 @@ class TelemetryClient:
             return False, "too_long"
 
         # Basic safety: no path separators or null bytes
-        if '/' in run_id or '\\' in run_id or '\x00' in run_id:
+        if _RUN_ID_INVALID_CHARS_RE.search(run_id):
             try:
                 self.run_id_metrics.increment_rejected_invalid_chars()
             except Exception:
@@ -954,3 +962,45 @@ class TelemetryClient:
                 return False, f"[ERROR] associate_commit failed: {e}"
 
         return False, "[ERROR] Commit association not available (no HTTP or database)"
+
+    def close(self):
+        """
+        Release the client's database connection, HTTP sessions and open
+        NDJSON file.
+
+        DatabaseWriter keeps a long-lived SQLite connection per thread, which
+        holds the database file open (and locked on Windows) until closed.
+        Call this when the agent is done with telemetry, or use the client as
+        a context manager. Safe to call more than once.
+        """
+        if self.database_writer:
+            try:
+                self.database_writer.close()
+            except Exception as e:
+                logger.warning(f"Failed to close database writer: {e}")
+
+        if self.http_api:
+            try:
+                self.http_api.close()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP API client: {e}")
+
+        if self.api_client:
+            try:
+                self.api_client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Google Sheets API client: {e}")
+
+        try:
+            self.ndjson_writer.close()
+        except Exception as e:
+            logger.warning(f"Failed to close NDJSON writer: {e}")
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit: close connections."""
+        self.close()
+        return False
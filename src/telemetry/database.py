@@ -4,16 +4,132 @@ Telemetry Platform - Database Writer
 Writes telemetry data to SQLite database with retry logic for lock contention.
 """
 
+import random
+import re
 import sqlite3
+import threading
 import time
 import logging
+import os
+from contextlib import closing
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 
 from .models import RunRecord
 
 logger = logging.getLogger(__name__)
 
+# First lock-retry backoff window in seconds; doubles on every further attempt
+_RETRY_BASE_DELAY = 0.001
+
+# Abbreviated or full git SHA: 7-40 hex characters
+_COMMIT_HASH_RE = re.compile(r'[a-fA-F0-9]{7,40}')
+
+# A NULL created_at/updated_at falls back to the column default instead of
+# overriding it (explicit NULLs bypass DEFAULT and violate NOT NULL in v7)
+_INSERT_RUN_SQL = """
+    INSERT INTO agent_runs (
+        event_id, run_id, schema_version, created_at, updated_at,
+        agent_name, agent_owner, job_type, trigger_type,
+        start_time, end_time, status,
+        product, product_family, platform, subdomain,
+        website, website_section, item_name,
+        items_discovered, items_succeeded, items_failed, items_skipped,
+        duration_ms,
+        input_summary, output_summary, source_ref, target_ref,
+        error_summary, error_details,
+        metrics_json, context_json,
+        insight_id, parent_run_id,
+        git_repo, git_branch, git_run_tag,
+        git_commit_hash, git_commit_source, git_commit_author, git_commit_timestamp,
+        host, environment,
+        api_posted, api_posted_at, api_retry_count
+    ) VALUES (
+        ?, ?, ?, COALESCE(?, datetime('now')), COALESCE(?, datetime('now')),
+        ?, ?, ?, ?,
+        ?, ?, ?,
+        ?, ?, ?, ?,
+        ?, ?, ?,
+        ?, ?, ?, ?,
+        ?,
+        ?, ?, ?, ?,
+        ?, ?,
+        ?, ?,
+        ?, ?,
+        ?, ?, ?,
+        ?, ?, ?, ?,
+        ?, ?,
+        ?, ?, ?
+    )
+"""
+
+# Served by the partial index idx_runs_pending_api (no temp B-tree sort)
+_PENDING_API_POSTS_SQL = """
+    SELECT * FROM agent_runs
+    WHERE api_posted = 0 AND status != 'running'
+    ORDER BY start_time DESC
+    LIMIT ?
+"""
+
+
+def _run_record_factory(cursor: sqlite3.Cursor, row: tuple) -> RunRecord:
+    """Row factory that builds a RunRecord directly from a SELECT * row."""
+    return RunRecord.from_dict(
+        {column[0]: value for column, value in zip(cursor.description, row)}
+    )
+
+
+def _insert_run_params(record: RunRecord) -> tuple:
+    """Build the parameter tuple for _INSERT_RUN_SQL from a RunRecord."""
+    return (
+        record.event_id,
+        record.run_id,
+        record.schema_version,
+        record.created_at,
+        record.updated_at,
+        record.agent_name,
+        record.agent_owner,
+        record.job_type,
+        record.trigger_type,
+        record.start_time,
+        record.end_time,
+        record.status,
+        record.product,
+        record.product_family,
+        record.platform,
+        record.subdomain,
+        record.website,
+        record.website_section,
+        record.item_name,
+        record.items_discovered,
+        record.items_succeeded,
+        record.items_failed,
+        record.items_skipped,
+        record.duration_ms,
+        record.input_summary,
+        record.output_summary,
+        record.source_ref,
+        record.target_ref,
+        record.error_summary,
+        record.error_details,
+        record.metrics_json,
+        record.context_json,
+        record.insight_id,
+        record.parent_run_id,
+        record.git_repo,
+        record.git_branch,
+        record.git_run_tag,
+        record.git_commit_hash,
+        record.git_commit_source,
+        record.git_commit_author,
+        record.git_commit_timestamp,
+        record.host,
+        record.environment,
+        record.api_posted,
+        record.api_posted_at,
+        record.api_retry_count,
+    )
+
 
 class DatabaseWriter:
     """
@@ -28,23 +144,67 @@ class DatabaseWriter:
     Concurrency Strategy:
     - Run summaries: 1 INSERT at start, 1 UPDATE at end (low frequency)
     - Events: Written to NDJSON only (avoids contention)
-    - Retry on lock: 100ms, 200ms, 400ms delays
+    - Retry on lock: exponential backoff with full jitter (1ms, 2ms, 4ms... windows,
+      capped at retry_delay)
+    - One long-lived connection per thread (see close())
+
+    Lifecycle: the cached connection keeps the database file open until
+    close() is called on the thread that opened it. Owners such as
+    TelemetryClient call close() on shutdown; standalone callers can use
+    the writer as a context manager.
 
     Note: DELETE mode is used instead of WAL because WAL requires shared memory files
     (.shm) that don't work across Docker volume mounts on Windows hosts.
     """
 
-    def __init__(self, database_path: Path, max_retries: int = 3):
+    def __init__(
+        self,
+        database_path: Union[str, Path],
+        max_retries: int = 3,
+        retry_delay: float = 0.1,
+    ):
         """
         Initialize database writer.
 
         Args:
-            database_path: Path to SQLite database file
+            database_path: Path to SQLite database file, or a "file:" URI
+                           (e.g. "file:telemetry?mode=memory&cache=shared")
             max_retries: Maximum retry attempts for locked database (default: 3)
+            retry_delay: Upper bound in seconds for a single lock-retry sleep
+                         (default: 0.1)
         """
-        self.database_path = Path(database_path)
+        # URIs are kept as strings: Path() would treat "file:" as a drive on Windows
+        self._is_uri = str(database_path).startswith("file:")
+        self._in_memory = self._is_uri and "mode=memory" in str(database_path)
+        self.database_path = str(database_path) if self._is_uri else Path(database_path)
         self.max_retries = max_retries
-        self.retry_delays = [0.1, 0.2, 0.4]  # 100ms, 200ms, 400ms
+        self.retry_delay = retry_delay
+        self._rng = random.Random()  # Per-instance jitter source
+        self._local = threading.local()  # Per-thread cached connection
+
+    def close(self) -> None:
+        """
+        Close the calling thread's cached connection, if any.
+
+        The next database operation on this thread opens a fresh connection.
+        Connections cached by other threads are closed when those threads
+        call close() or when the writer is garbage collected. A connection
+        inherited across os.fork() is only dropped, not closed.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            if self._local.pid == os.getpid():
+                conn.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit: close this thread's connection."""
+        self.close()
+        return False
 
     def check_integrity(self, quick: bool = True) -> tuple[bool, str]:
         """
@@ -58,10 +218,10 @@ class DatabaseWriter:
             Tuple of (is_healthy: bool, message: str)
         """
         try:
-            if not self.database_path.exists():
+            if not self._is_uri and not self.database_path.exists():
                 return False, "Database file does not exist"
 
-            conn = sqlite3.connect(self.database_path)
+            conn = sqlite3.connect(self.database_path, uri=self._is_uri)
             cursor = conn.cursor()
 
             check_type = "quick_check" if quick else "integrity_check"
@@ -81,29 +241,62 @@ class DatabaseWriter:
 
     def _get_connection(self) -> sqlite3.Connection:
         """
-        Get database connection with DELETE mode and corruption prevention settings.
+        Get this thread's database connection, opening it on first use.
+
+        Reusing one connection per thread means the pragmas below are applied
+        once instead of on every insert/update/read. A connection inherited
+        across os.fork() is never reused (SQLite forbids it); the child opens
+        its own.
+
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open_connection()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
 
-        Creates the database directory if it doesn't exist before connecting.
+    def _open_connection(self) -> sqlite3.Connection:
+        """
+        Open a database connection with DELETE mode and corruption prevention settings.
+
+        Creates the database directory if it doesn't exist before connecting
+        (skipped for "file:" URIs, which are opened with uri=True).
         Configures SQLite pragmas to prevent corruption:
         - DELETE mode for Docker volume mount compatibility (WAL requires shared memory files)
         - busy_timeout to wait for locks instead of failing immediately
         - synchronous=FULL for durability and corruption prevention
+        - temp_store=MEMORY so sorts and temp indexes never touch disk
+        - cache_size=-16384 (16 MiB page cache); the connection is reused per
+          thread, so repeated reads are served from cache. mmap_size stays 0:
+          memory-mapped I/O has the same Docker/Windows volume issues as WAL
+        - isolation_level="IMMEDIATE" so every write transaction starts with
+          BEGIN IMMEDIATE and takes the write lock up front, instead of
+          upgrading from a read lock mid-transaction (which can deadlock and
+          fail with SQLITE_BUSY without waiting on busy_timeout)
 
         Returns:
             sqlite3.Connection: Database connection
         """
         # Ensure database directory exists before connecting
-        db_dir = self.database_path.parent
-        if not db_dir.exists():
-            db_dir.mkdir(parents=True, exist_ok=True)
-            logger.info(f"Created database directory: {db_dir}")
-
-        conn = sqlite3.connect(self.database_path)
+        if not self._is_uri:
+            db_dir = self.database_path.parent
+            if not db_dir.exists():
+                db_dir.mkdir(parents=True, exist_ok=True)
+                logger.info(f"Created database directory: {db_dir}")
+
+        conn = sqlite3.connect(
+            self.database_path, uri=self._is_uri, isolation_level="IMMEDIATE"
+        )
 
         # Corruption prevention settings (production-grade)
         conn.execute("PRAGMA busy_timeout=30000")  # Wait 30s for locks (increased from 5s)
         conn.execute("PRAGMA journal_mode=DELETE")  # DELETE mode for Docker compatibility (changed from WAL)
         conn.execute("PRAGMA synchronous=FULL")  # CRITICAL: Prevent corruption on crashes
+        conn.execute("PRAGMA temp_store=MEMORY")  # Temp b-trees in RAM; no effect on durability
+        conn.execute("PRAGMA cache_size=-16384")  # 16 MiB page cache (negative = KiB)
 
         # Verify settings were applied correctly
         cursor = conn.cursor()
@@ -119,7 +312,8 @@ class DatabaseWriter:
         # Warn if critical settings don't match expected values
         if actual_timeout != 30000:
             logger.warning(f"busy_timeout is {actual_timeout}ms, expected 30000ms")
-        if actual_journal.lower() != "delete":
+        # In-memory databases always report journal_mode=memory
+        if actual_journal.lower() != "delete" and not self._in_memory:
             logger.warning(f"journal_mode is {actual_journal}, expected delete")
         if actual_sync != 2:  # 2 = FULL
             logger.warning(f"synchronous is {actual_sync}, expected 2 (FULL)")
@@ -127,15 +321,17 @@ class DatabaseWriter:
         return conn
 
     def _execute_with_retry(
-        self, operation: str, params: tuple, fetch: bool = False
+        self, operation: str, params: tuple, fetch: bool = False, many: bool = False
     ) -> tuple[bool, Optional[Any], str]:
         """
         Execute database operation with retry logic.
 
         Args:
             operation: SQL statement
-            params: Parameters for SQL statement
+            params: Parameters for SQL statement (a sequence of tuples if many=True)
             fetch: Whether to fetch results
+            many: Run the statement once per parameter tuple via executemany,
+                  all within a single transaction
 
         Returns:
             Tuple of (success: bool, result: Any, message: str)
@@ -143,31 +339,34 @@ class DatabaseWriter:
         last_error = None
 
         for attempt in range(self.max_retries):
+            conn = None
             try:
                 conn = self._get_connection()
-                cursor = conn.cursor()
-
-                cursor.execute(operation, params)
+                with closing(conn.cursor()) as cursor:
+                    if many:
+                        cursor.executemany(operation, params)
+                    else:
+                        cursor.execute(operation, params)
 
-                result = None
-                if fetch:
-                    result = cursor.fetchone()
+                    result = None
+                    if fetch:
+                        result = cursor.fetchone()
 
                 conn.commit()
-                conn.close()
 
                 return True, result, "[OK] Database write successful"
 
             except sqlite3.OperationalError as e:
                 last_error = e
                 error_msg = str(e).lower()
+                self._rollback(conn)
 
                 # Check if it's a lock error
                 if "locked" in error_msg or "busy" in error_msg:
                     if attempt < self.max_retries - 1:
-                        # Retry with exponential backoff
-                        delay = self.retry_delays[attempt]
-                        time.sleep(delay)
+                        # Retry with jittered exponential backoff: most locks
+                        # clear within milliseconds, so don't sleep a fixed step
+                        time.sleep(self._retry_backoff(attempt))
                         continue
                     else:
                         # Max retries reached
@@ -177,15 +376,31 @@ class DatabaseWriter:
                             f"[WARN] Database locked after {self.max_retries} retries",
                         )
                 else:
-                    # Non-lock error, don't retry
+                    # Non-lock error, don't retry. Drop the connection too, in
+                    # case the error left it unusable (e.g. disk I/O error).
+                    self.close()
                     return False, None, f"[FAIL] Database error: {e}"
 
             except Exception as e:
+                self._rollback(conn)
                 return False, None, f"[FAIL] Unexpected database error: {e}"
 
         # Should not reach here, but just in case
         return False, None, f"[FAIL] Database operation failed: {last_error}"
 
+    def _retry_backoff(self, attempt: int) -> float:
+        """Return a full-jitter sleep for the given attempt, capped at retry_delay."""
+        return self._rng.uniform(0, min(self.retry_delay, _RETRY_BASE_DELAY * (2 ** attempt)))
+
+    @staticmethod
+    def _rollback(conn: Optional[sqlite3.Connection]) -> None:
+        """Roll back a failed statement so no write lock outlives the call."""
+        if conn is not None and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+
     def insert_run(self, record: RunRecord) -> tuple[bool, str]:
         """
         Insert a new run record into the database.
@@ -196,91 +411,29 @@ class DatabaseWriter:
         Returns:
             Tuple of (success: bool, message: str)
         """
-        sql = """
-            INSERT INTO agent_runs (
-                event_id, run_id, schema_version, created_at, updated_at,
-                agent_name, agent_owner, job_type, trigger_type,
-                start_time, end_time, status,
-                product, product_family, platform, subdomain,
-                website, website_section, item_name,
-                items_discovered, items_succeeded, items_failed, items_skipped,
-                duration_ms,
-                input_summary, output_summary, source_ref, target_ref,
-                error_summary, error_details,
-                metrics_json, context_json,
-                insight_id, parent_run_id,
-                git_repo, git_branch, git_run_tag,
-                git_commit_hash, git_commit_source, git_commit_author, git_commit_timestamp,
-                host, environment,
-                api_posted, api_posted_at, api_retry_count
-            ) VALUES (
-                ?, ?, ?, ?, ?,
-                ?, ?, ?, ?,
-                ?, ?, ?,
-                ?, ?, ?, ?,
-                ?, ?, ?,
-                ?, ?, ?, ?,
-                ?,
-                ?, ?, ?, ?,
-                ?, ?,
-                ?, ?,
-                ?, ?,
-                ?, ?, ?,
-                ?, ?, ?, ?,
-                ?, ?,
-                ?, ?, ?
-            )
-        """
-        params = (
-            record.event_id,
-            record.run_id,
-            record.schema_version,
-            record.created_at,
-            record.updated_at,
-            record.agent_name,
-            record.agent_owner,
-            record.job_type,
-            record.trigger_type,
-            record.start_time,
-            record.end_time,
-            record.status,
-            record.product,
-            record.product_family,
-            record.platform,
-            record.subdomain,
-            record.website,
-            record.website_section,
-            record.item_name,
-            record.items_discovered,
-            record.items_succeeded,
-            record.items_failed,
-            record.items_skipped,
-            record.duration_ms,
-            record.input_summary,
-            record.output_summary,
-            record.source_ref,
-            record.target_ref,
-            record.error_summary,
-            record.error_details,
-            record.metrics_json,
-            record.context_json,
-            record.insight_id,
-            record.parent_run_id,
-            record.git_repo,
-            record.git_branch,
-            record.git_run_tag,
-            record.git_commit_hash,
-            record.git_commit_source,
-            record.git_commit_author,
-            record.git_commit_timestamp,
-            record.host,
-            record.environment,
-            record.api_posted,
-            record.api_posted_at,
-            record.api_retry_count,
+        success, _, message = self._execute_with_retry(
+            _INSERT_RUN_SQL, _insert_run_params(record)
         )
+        return success, message
 
-        success, _, message = self._execute_with_retry(sql, params)
+    def insert_runs_bulk(self, records: list[RunRecord]) -> tuple[bool, str]:
+        """
+        Insert many run records in a single transaction.
+
+        All rows are written with one executemany and one commit, so N records
+        cost one fsync instead of N. Either every record is inserted or none is.
+
+        Args:
+            records: RunRecords to insert
+
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        if not records:
+            return True, "[OK] No records to insert"
+
+        params = [_insert_run_params(record) for record in records]
+        success, _, message = self._execute_with_retry(_INSERT_RUN_SQL, params, many=True)
         return success, message
 
     def update_run(self, record: RunRecord) -> tuple[bool, str]:
@@ -391,20 +544,10 @@ class DatabaseWriter:
 
         try:
             conn = self._get_connection()
-            conn.row_factory = sqlite3.Row  # Enable column access by name
-            cursor = conn.cursor()
-
-            cursor.execute(sql, (run_id,))
-            row = cursor.fetchone()
-
-            conn.close()
-
-            if row:
-                # Convert row to dictionary
-                data = dict(row)
-                return RunRecord.from_dict(data)
-
-            return None
+            with closing(conn.cursor()) as cursor:
+                cursor.row_factory = _run_record_factory
+                cursor.execute(sql, (run_id,))
+                return cursor.fetchone()
 
         except Exception:
             return None
@@ -429,23 +572,25 @@ class DatabaseWriter:
         success, _, message = self._execute_with_retry(sql, (posted_at, run_id))
         return success, message
 
-    def increment_api_retry_count(self, run_id: str) -> tuple[bool, str]:
+    def increment_api_retry_count(self, run_id: str, by: int = 1) -> tuple[bool, str]:
         """
         Increment the API retry count for a run.
 
         Args:
             run_id: Run ID to update
+            by: Amount to add to the retry count (default: 1), so several
+                failed attempts can be recorded in one write
 
         Returns:
             Tuple of (success: bool, message: str)
         """
         sql = """
             UPDATE agent_runs
-            SET api_retry_count = api_retry_count + 1
+            SET api_retry_count = api_retry_count + ?
             WHERE run_id = ?
         """
 
-        success, _, message = self._execute_with_retry(sql, (run_id,))
+        success, _, message = self._execute_with_retry(sql, (by, run_id))
         return success, message
 
     def get_pending_api_posts(self, limit: int = 100) -> list[RunRecord]:
@@ -458,29 +603,12 @@ class DatabaseWriter:
         Returns:
             List of RunRecord objects
         """
-        sql = """
-            SELECT * FROM agent_runs
-            WHERE api_posted = 0 AND status != 'running'
-            ORDER BY start_time DESC
-            LIMIT ?
-        """
-
         try:
             conn = self._get_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute(sql, (limit,))
-            rows = cursor.fetchall()
-
-            conn.close()
-
-            records = []
-            for row in rows:
-                data = dict(row)
-                records.append(RunRecord.from_dict(data))
-
-            return records
+            with closing(conn.cursor()) as cursor:
+                cursor.row_factory = _run_record_factory
+                cursor.execute(_PENDING_API_POSTS_SQL, (limit,))
+                return cursor.fetchall()
 
         except Exception:
             return []
@@ -519,15 +647,13 @@ class DatabaseWriter:
             ... )
             (True, "[OK] Commit associated successfully")
         """
-        import re
-
         # Validate commit_source
         valid_sources = ('manual', 'llm', 'ci')
         if commit_source not in valid_sources:
             return False, f"[FAIL] Invalid commit_source '{commit_source}'. Must be one of: {valid_sources}"
 
         # Validate commit_hash format (40-char hex, optional for flexibility)
-        if commit_hash and not re.match(r'^[a-fA-F0-9]{7,40}$', commit_hash):
+        if commit_hash and not _COMMIT_HASH_RE.fullmatch(commit_hash):
             return False, f"[FAIL] Invalid commit_hash format. Expected 7-40 hex characters, got: {commit_hash}"
 
         # Check run exists
@@ -575,12 +701,9 @@ class DatabaseWriter:
         """
         try:
             conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute(f"PRAGMA wal_checkpoint({mode})")
-            result = cursor.fetchone()
-
-            conn.close()
+            with closing(conn.cursor()) as cursor:
+                cursor.execute(f"PRAGMA wal_checkpoint({mode})")
+                result = cursor.fetchone()
 
             # result is (busy, log, checkpointed)
             # 0 = successful, 1 = blocked
@@ -601,32 +724,23 @@ class DatabaseWriter:
         """
         try:
             conn = self._get_connection()
-            cursor = conn.cursor()
-
-            # Total runs
-            cursor.execute("SELECT COUNT(*) FROM agent_runs")
-            total_runs = cursor.fetchone()[0]
-
-            # Runs by status
-            cursor.execute(
-                """
-                SELECT status, COUNT(*) as count
-                FROM agent_runs
-                GROUP BY status
-            """
-            )
-            status_counts = {row[0]: row[1] for row in cursor.fetchall()}
-
-            # Pending API posts
-            cursor.execute(
+            with closing(conn.cursor()) as cursor:
+                # One pass over agent_runs: per-status totals plus how many
+                # rows in each status are still pending an API post
+                cursor.execute(
+                    """
+                    SELECT status,
+                           COUNT(*) as count,
+                           SUM(api_posted = 0 AND status != 'running') as pending
+                    FROM agent_runs
+                    GROUP BY status
                 """
-                SELECT COUNT(*) FROM agent_runs
-                WHERE api_posted = 0 AND status != 'running'
-            """
-            )
-            pending_api = cursor.fetchone()[0]
+                )
+                rows = cursor.fetchall()
 
-            conn.close()
+            status_counts = {row[0]: row[1] for row in rows}
+            total_runs = sum(row[1] for row in rows)
+            pending_api = sum(row[2] or 0 for row in rows)
 
             return {
                 "total_runs": total_runs,
@@ -5,20 +5,264 @@ Provides automatic detection of Git repository context (repo name, branch, run t
 with performance caching to avoid repeated subprocess calls.
 
 Design Goals:
-- Zero dependencies beyond subprocess (standard library)
+- Zero dependencies beyond subprocess (standard library); uses pygit2
+  in-process when installed (pip install telemetry[git]), no git spawn
 - Fail-safe: Always returns None on errors (never crashes agent)
-- Performance: Single detection per session via caching
+- Performance: Single detection per session via caching, shared by every
+  detector in the process and optionally persisted to disk across processes
+  (keyed on .git/HEAD and .git/config mtimes)
 - Cross-platform: Works on Windows, Linux, macOS
 - Respects explicit values: Never overrides user-provided values
 """
 
+import hashlib
+import json
+import re
 import subprocess
 import logging
 import os
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Dict, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+try:
+    import pygit2
+
+    HAS_PYGIT2 = True
+except ImportError:
+    HAS_PYGIT2 = False
+
+# Last path (or scp-style "host:") segment of a remote URL, minus any ".git"
+# suffix and trailing slashes
+_REPO_NAME_RE = re.compile(r"([^/:]*?)(?:\.git)?/*$")
+
+
+def _git_state_key(working_dir: str) -> Optional[tuple[int, int]]:
+    """
+    Fingerprint the repository state without running git.
+
+    Walks up from working_dir to the nearest .git directory and returns the
+    mtimes of HEAD (changes on checkout/commit to a new branch) and config
+    (changes when remotes change). Worktrees and submodules, where .git is
+    a file, get no fingerprint.
+
+    Returns:
+        (head_mtime_ns, config_mtime_ns), or None if no .git directory is found
+    """
+    try:
+        directory = Path(working_dir).resolve()
+        for candidate in (directory, *directory.parents):
+            git_dir = candidate / ".git"
+            if git_dir.is_dir():
+                return (
+                    (git_dir / "HEAD").stat().st_mtime_ns,
+                    (git_dir / "config").stat().st_mtime_ns,
+                )
+            if git_dir.exists():
+                return None
+    except OSError as e:
+        logger.debug(f"Git state fingerprint unavailable: {e}")
+
+    return None
+
+
+# Process-wide context cache shared by all detectors, keyed on
+# (working_dir, state_key); holds at most _SHARED_CONTEXTS_MAX entries
+_shared_contexts: Dict[tuple[str, tuple[int, int]], tuple] = {}
+_SHARED_CONTEXTS_MAX = 32
+
+
+def _remember_context(working_dir: str, state_key: tuple[int, int], items: tuple) -> None:
+    """Store a detected context in the process-wide cache, evicting the oldest entry."""
+    if len(_shared_contexts) >= _SHARED_CONTEXTS_MAX:
+        del _shared_contexts[next(iter(_shared_contexts))]
+    _shared_contexts[(working_dir, state_key)] = items
+
+
+def _detect_git_context(working_dir: str) -> tuple:
+    """
+    Detect git context for working_dir.
+
+    The context is returned as a tuple of items to keep it immutable, so it
+    can be shared through _shared_contexts.
+
+    Returns:
+        Tuple of (key, value) pairs; empty if not in a Git repository
+    """
+    # Read in-process with libgit2 when available; otherwise (or if libgit2
+    # cannot answer) detect repository and branch in one git invocation
+    result = _read_with_pygit2(working_dir) if HAS_PYGIT2 else None
+    if result is not None:
+        in_repo, git_branch, remote_url = result
+        git_repo = _repo_name_from_url(remote_url) if remote_url else None
+    else:
+        in_repo, git_branch = _rev_parse_head(working_dir)
+        git_repo = _get_repo_name(working_dir) if in_repo else None
+
+    if not in_repo:
+        logger.debug("Not in a Git repository")
+        return ()
+
+    # Build context
+    context = {}
+
+    if git_repo:
+        context["git_repo"] = git_repo
+
+    if git_branch:
+        context["git_branch"] = git_branch
+
+    # Build git_run_tag (combines repo and branch for grouping)
+    if git_repo and git_branch:
+        context["git_run_tag"] = f"{git_repo}/{git_branch}"
+    elif git_repo:
+        context["git_run_tag"] = git_repo
+
+    return tuple(context.items())
+
+
+def _read_with_pygit2(working_dir: str) -> Optional[tuple[bool, Optional[str], Optional[str]]]:
+    """
+    Read repository, branch and origin URL in-process with pygit2 (libgit2).
+
+    Returns:
+        Tuple of (in_repo, branch, remote_url), or None if libgit2 fails so
+        the caller can fall back to the git command line
+    """
+    try:
+        repo_path = pygit2.discover_repository(working_dir)
+        if repo_path is None:
+            return False, None, None
+
+        repo = pygit2.Repository(repo_path)
+
+        # Detached HEAD and unborn branches have no branch name
+        branch = None
+        if not repo.head_is_detached and not repo.head_is_unborn:
+            branch = repo.head.shorthand
+
+        try:
+            remote_url = repo.remotes["origin"].url
+        except KeyError:
+            logger.debug("No remote.origin.url configured")
+            remote_url = None
+
+        return True, branch, remote_url
+
+    except Exception as e:
+        logger.debug(f"pygit2 detection failed, falling back to git: {e}")
+        return None
+
+
+def _rev_parse_head(working_dir: str) -> tuple[bool, Optional[str]]:
+    """
+    Check for a Git repository and read the current branch in one call.
+
+    Uses: git rev-parse --git-dir --abbrev-ref HEAD
+
+    Prints the git dir on the first line and the branch on the second.
+    Outside a repository nothing is printed. On an unborn branch git
+    exits non-zero but still prints the git dir followed by "HEAD".
+
+    Returns:
+        Tuple of (in_repo, branch); branch is None when unavailable
+        (detached HEAD, unborn branch, or errors)
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--git-dir", "--abbrev-ref", "HEAD"],
+            cwd=working_dir,
+            capture_output=True,
+            timeout=5,  # 5 second timeout
+        )
+
+        # Output is read as bytes; git writes UTF-8 regardless of locale, so
+        # only the branch line is decoded
+        lines = result.stdout.splitlines()
+
+        # No git dir line means we're not in a Git repo
+        if not lines:
+            return False, None
+
+        branch = lines[1].strip().decode("utf-8", "replace") if len(lines) > 1 else ""
+
+        # Handle detached HEAD state
+        if branch == "HEAD":
+            logger.debug("In detached HEAD state")
+            return True, None
+
+        return True, branch or None
+
+    except subprocess.TimeoutExpired:
+        logger.warning("Git command timed out")
+        return False, None
+
+    except FileNotFoundError:
+        # Git not installed
+        logger.debug("Git command not found (git not installed)")
+        return False, None
+
+    except Exception as e:
+        logger.warning(f"Failed to check if Git repo: {e}")
+        return False, None
+
+
+def _get_repo_name(working_dir: str) -> Optional[str]:
+    """
+    Get repository name from Git remote URL.
+
+    Uses: git config --get remote.origin.url
+
+    Extracts repo name from URLs like:
+    - https://github.com/user/repo.git -> "repo"
+    - git@github.com:user/repo.git -> "repo"
+    - /path/to/repo.git -> "repo"
+
+    Returns:
+        Repository name or None if not available
+    """
+    try:
+        result = subprocess.run(
+            ["git", "config", "--get", "remote.origin.url"],
+            cwd=working_dir,
+            capture_output=True,
+            timeout=5,
+        )
+
+        if result.returncode != 0:
+            logger.debug("No remote.origin.url configured")
+            return None
+
+        # Parse URL to extract repo name
+        url = result.stdout.strip().decode("utf-8", "replace")
+
+        if not url:
+            return None
+
+        return _repo_name_from_url(url)
+
+    except subprocess.TimeoutExpired:
+        logger.warning("Git config command timed out")
+        return None
+
+    except Exception as e:
+        logger.warning(f"Failed to get repo name: {e}")
+        return None
+
+
+def _repo_name_from_url(url: str) -> Optional[str]:
+    """
+    Extract the repository name from a remote URL.
+
+    Handles various formats: https://.../repo.git, git@...:repo.git, /path/repo.git
+
+    Returns:
+        Repository name or None if the URL has none
+    """
+    match = _REPO_NAME_RE.search(url)
+    return (match.group(1) or None) if match else None
+
 
 class GitDetector:
     """
@@ -26,7 +270,9 @@ class GitDetector:
 
     Features:
     - Automatic detection of git_repo, git_branch, git_run_tag
-    - Performance caching (single detection per session)
+    - Performance caching (single detection per session, shared across
+      detectors for the same working directory; optional on-disk cache so new
+      processes skip git while HEAD and config are unchanged)
     - Fail-safe error handling (never crashes)
     - Cross-platform compatibility (Windows/Linux/macOS)
     - Respects explicit values (never overrides)
@@ -38,17 +284,30 @@ class GitDetector:
         # Or: {} if not in a Git repository
     """
 
-    def __init__(self, working_dir: Optional[str] = None, auto_detect: bool = True):
+    def __init__(
+        self,
+        working_dir: Optional[str] = None,
+        auto_detect: bool = True,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ):
         """
         Initialize Git detector.
 
         Args:
             working_dir: Directory to check for Git repo (defaults to current directory)
             auto_detect: Enable/disable automatic detection (default: True)
+            cache_dir: Directory for the on-disk context cache (default: None,
+                       in-process caching only)
         """
         self.working_dir = working_dir or os.getcwd()
         self.auto_detect = auto_detect
 
+        # On-disk cache file, one per working directory
+        self._cache_file: Optional[Path] = None
+        if cache_dir is not None:
+            digest = hashlib.sha1(self.working_dir.encode("utf-8")).hexdigest()
+            self._cache_file = Path(cache_dir) / f"gitctx-{digest}.json"
+
         # Cache for git context (populated on first detection)
         self._cached_context: Optional[Dict[str, str]] = None
         self._detection_attempted = False
@@ -93,38 +352,49 @@ class GitDetector:
         self._detection_attempted = True
 
         try:
-            # Detect if we're in a Git repository
-            if not self._is_git_repo():
-                logger.debug("Not in a Git repository")
-                self._cached_context = {}
-                return {}
-
-            # Detect git metadata
-            git_repo = self._get_repo_name()
-            git_branch = self._get_current_branch()
-
-            # Build context
-            context = {}
-
-            if git_repo:
-                context["git_repo"] = git_repo
-
-            if git_branch:
-                context["git_branch"] = git_branch
-
-            # Build git_run_tag (combines repo and branch for grouping)
-            if git_repo and git_branch:
-                context["git_run_tag"] = f"{git_repo}/{git_branch}"
-            elif git_repo:
-                context["git_run_tag"] = git_repo
+            # state_key is part of every cache key, so a checkout or remote
+            # change is picked up instead of being served stale. Without a
+            # fingerprint a cached entry could never be invalidated, so
+            # nothing is cached.
+            state_key = _git_state_key(self.working_dir)
+            disk_key = self._disk_cache_key(state_key)
+
+            # force_refresh also drops the process-wide cache, so other
+            # detectors don't keep serving the stale entry
+            if force_refresh:
+                _shared_contexts.clear()
+
+            # Serve from the process-wide cache, then from the on-disk cache,
+            # while .git/HEAD and .git/config are unchanged
+            if state_key is not None and not force_refresh:
+                items = _shared_contexts.get((self.working_dir, state_key))
+                if items is not None:
+                    logger.debug("Returning git context from process cache")
+                    self._cached_context = dict(items)
+                    return self._cached_context
+
+            if disk_key is not None and not force_refresh:
+                context = self._read_disk_cache(disk_key)
+                if context is not None:
+                    logger.debug("Returning git context from disk cache")
+                    _remember_context(self.working_dir, state_key, tuple(context.items()))
+                    self._cached_context = context
+                    return context
+
+            items = _detect_git_context(self.working_dir)
+            if state_key is not None:
+                _remember_context(self.working_dir, state_key, items)
+            context = dict(items)
 
             # Cache the result
             self._cached_context = context
+            if disk_key is not None:
+                self._write_disk_cache(disk_key, context)
 
             if context:
                 logger.info(f"Git context detected: {context}")
             else:
-                logger.debug("Git repository detected but no context available")
+                logger.debug("Git repository not detected or no context available")
 
             return context
 
@@ -134,140 +404,76 @@ class GitDetector:
             self._cached_context = {}
             return {}
 
-    def _is_git_repo(self) -> bool:
+    def _disk_cache_key(self, state_key: Optional[tuple[int, int]]) -> Optional[Dict[str, object]]:
         """
-        Check if current directory is inside a Git repository.
-
-        Uses: git rev-parse --git-dir
+        Build the on-disk cache key from the repository fingerprint.
 
         Returns:
-            True if in a Git repo, False otherwise
+            Key dict, or None if disk caching is off or there is no fingerprint
         """
-        try:
-            result = subprocess.run(
-                ["git", "rev-parse", "--git-dir"],
-                cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=5,  # 5 second timeout
-            )
-
-            # Exit code 0 means we're in a Git repo
-            return result.returncode == 0
-
-        except subprocess.TimeoutExpired:
-            logger.warning("Git command timed out")
-            return False
-
-        except FileNotFoundError:
-            # Git not installed
-            logger.debug("Git command not found (git not installed)")
-            return False
+        if self._cache_file is None or state_key is None:
+            return None
 
-        except Exception as e:
-            logger.warning(f"Failed to check if Git repo: {e}")
-            return False
+        head_mtime_ns, config_mtime_ns = state_key
+        return {
+            "working_dir": self.working_dir,
+            "head_mtime_ns": head_mtime_ns,
+            "config_mtime_ns": config_mtime_ns,
+        }
 
-    def _get_repo_name(self) -> Optional[str]:
+    def _read_disk_cache(self, key: Dict[str, object]) -> Optional[Dict[str, str]]:
         """
-        Get repository name from Git remote URL.
-
-        Uses: git config --get remote.origin.url
-
-        Extracts repo name from URLs like:
-        - https://github.com/user/repo.git -> "repo"
-        - git@github.com:user/repo.git -> "repo"
-        - /path/to/repo.git -> "repo"
+        Load cached context if the stored key matches.
 
         Returns:
-            Repository name or None if not available
+            Cached context, or None on a miss or unreadable cache file
         """
         try:
-            result = subprocess.run(
-                ["git", "config", "--get", "remote.origin.url"],
-                cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-
-            if result.returncode != 0:
-                logger.debug("No remote.origin.url configured")
-                return None
-
-            # Parse URL to extract repo name
-            url = result.stdout.strip()
-
-            if not url:
-                return None
-
-            # Extract repo name from URL
-            # Handle various formats: https://.../repo.git, git@...:repo.git, /path/repo.git
-            repo_name = url.rstrip("/").split("/")[-1]
-
-            # Remove .git suffix if present
-            if repo_name.endswith(".git"):
-                repo_name = repo_name[:-4]
-
-            # Remove any remaining path separators (for git@... format)
-            if ":" in repo_name:
-                repo_name = repo_name.split(":")[-1]
-
-            return repo_name if repo_name else None
-
-        except subprocess.TimeoutExpired:
-            logger.warning("Git config command timed out")
+            with open(self._cache_file, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
             return None
 
-        except Exception as e:
-            logger.warning(f"Failed to get repo name: {e}")
+        if not isinstance(entry, dict) or entry.get("key") != key:
             return None
 
-    def _get_current_branch(self) -> Optional[str]:
-        """
-        Get current Git branch name.
+        context = entry.get("context")
+        return context if isinstance(context, dict) else None
 
-        Uses: git rev-parse --abbrev-ref HEAD
+    def _write_disk_cache(self, key: Dict[str, object], context: Dict[str, str]):
+        """
+        Atomically replace the cache file (write temp file, then os.replace).
 
-        Returns:
-            Branch name (e.g., "main") or None if not available
+        Failures are logged and ignored; the cache is only an optimization.
         """
+        tmp_file = self._cache_file.with_name(f"{self._cache_file.name}.{os.getpid()}.tmp")
         try:
-            result = subprocess.run(
-                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-                cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-
-            if result.returncode != 0:
-                logger.debug("Failed to get current branch")
-                return None
-
-            branch = result.stdout.strip()
-
-            # Handle detached HEAD state
-            if branch == "HEAD":
-                logger.debug("In detached HEAD state")
-                return None
-
-            return branch if branch else None
-
-        except subprocess.TimeoutExpired:
-            logger.warning("Git branch command timed out")
-            return None
-
-        except Exception as e:
-            logger.warning(f"Failed to get current branch: {e}")
-            return None
+            self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "context": context}, f)
+            os.replace(tmp_file, self._cache_file)
+        except OSError as e:
+            logger.debug(f"Failed to write git context cache: {e}")
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
 
     def clear_cache(self):
         """
         Clear cached Git context.
 
+        Clears this detector's cache, the process-wide cache shared by all
+        detectors, and the on-disk cache file (if any).
+
         Useful for testing or when Git state changes during runtime.
         """
         self._cached_context = None
         self._detection_attempted = False
+        _shared_contexts.clear()
+        if self._cache_file is not None:
+            try:
+                os.remove(self._cache_file)
+            except OSError:
+                pass
         logger.debug("Git context cache cleared")
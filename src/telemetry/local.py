@@ -4,12 +4,170 @@ Telemetry Platform - Local NDJSON Writer
 Writes telemetry events to newline-delimited JSON files with file locking for concurrent access.
 """
 
+import atexit
+import enum
 import json
+import math
+import mmap
 import os
+import re
 import sys
+import threading
+import time
+from collections import deque
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from uuid import UUID
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _has_nonfinite(value: Any) -> bool:
+    """Return True if value holds a NaN or infinite float at any depth."""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_nonfinite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_nonfinite(v) for v in value)
+    return False
+
+
+def _dumps_line_stdlib(payload: Dict[str, Any]) -> bytes:
+    """Serialize one record as a UTF-8 NDJSON line with the json module."""
+    text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    try:
+        return (text + "\n").encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates have no UTF-8 form; keep them as \u escapes
+        return (json.dumps(payload, separators=(",", ":")) + "\n").encode("ascii")
+
+
+# Dict key types json.dumps accepts as-is; orjson's OPT_NON_STR_KEYS also
+# takes dates, UUIDs and enums, which json.dumps rejects
+_JSON_KEY_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# orjson serializes these natively with no passthrough option
+_ORJSON_NATIVE_TYPES = (UUID, enum.Enum)
+
+# Make orjson reject every type json.dumps rejects: datetimes, dataclasses
+# and subclasses of str/int/dict/list are passed to default, which raises
+_ORJSON_OPTIONS = (
+    orjson.OPT_APPEND_NEWLINE
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_PASSTHROUGH_SUBCLASS
+    if HAS_ORJSON
+    else 0
+)
+
+
+def _orjson_reject(value: Any) -> Any:
+    """orjson default hook: refuse anything without a native JSON form."""
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _has_orjson_only_type(value: Any) -> bool:
+    """Return True if value holds a key or value only orjson can serialize."""
+    if isinstance(value, dict):
+        return any(
+            type(k) not in _JSON_KEY_TYPES or _has_orjson_only_type(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return any(_has_orjson_only_type(v) for v in value)
+    return isinstance(value, _ORJSON_NATIVE_TYPES)
+
+
+def _dumps_line(payload: Dict[str, Any]) -> bytes:
+    """
+    Serialize one record as a UTF-8 NDJSON line.
+
+    Uses orjson when installed (pip install telemetry[fast]) and falls back
+    to the json module for records orjson cannot represent the same way:
+    integers beyond 64 bits, lone surrogates, NaN/Infinity (which orjson
+    would silently write as null), and any type json.dumps does not accept
+    (datetimes, UUIDs, enums, dataclasses), so such records raise TypeError
+    whether or not orjson is installed. Both paths write compact,
+    non-escaped lines.
+    """
+    if HAS_ORJSON and not _has_orjson_only_type(payload):
+        try:
+            line = orjson.dumps(payload, default=_orjson_reject, option=_ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            return _dumps_line_stdlib(payload)
+        # orjson writes non-finite floats as null, so only then check for them
+        if b"null" in line and _has_nonfinite(payload):
+            return _dumps_line_stdlib(payload)
+        return line
+    return _dumps_line_stdlib(payload)
+
+
+# 19+ digit runs may be integers orjson reads as floats (or rejects)
+_LONG_DIGITS_RE = re.compile(rb"\d{19}")
+
+
+def _loads(data: bytes) -> Any:
+    """
+    Parse JSON bytes, with orjson when installed.
+
+    Input orjson cannot parse (NaN/Infinity written by the json module) or
+    might parse lossily (integers beyond 64 bits) goes to json.loads.
+    """
+    if HAS_ORJSON and not _LONG_DIGITS_RE.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+# Slice size for counting lines, so large files are never copied whole
+_COUNT_CHUNK = 1 << 20
+
+# Whitespace bytes.strip() removes; a line of only these is blank
+_BLANK_BYTES = b" \t\n\r\x0b\x0c"
+
+# A newline followed by a blank byte: a chunk may hold a blank line only if
+# this matches or the chunk starts with a blank byte
+_MAYBE_BLANK_RE = re.compile(rb"\n[ \t\n\r\x0b\x0c]")
+
+# Any byte that makes a line non-blank
+_NON_BLANK_RE = re.compile(rb"[^ \t\n\r\x0b\x0c]")
+
+
+def _count_nonblank_lines(mm: mmap.mmap) -> int:
+    """
+    Count the lines of a mapped file that read_file() would parse.
+
+    The file is scanned in chunks of about _COUNT_CHUNK bytes, each ending
+    on a newline. A chunk that cannot hold a blank line is counted with
+    bytes.count() in C; only chunks that may hold one are split into lines.
+    """
+    size = len(mm)
+    count = 0
+    start = 0
+    while start < size:
+        end = mm.find(b"\n", min(start + _COUNT_CHUNK, size) - 1)
+        if end == -1:
+            end = mm.rfind(b"\n", start)
+        if end == -1:
+            # Unterminated last line: count it if any byte is not whitespace
+            return count + (1 if _NON_BLANK_RE.search(mm, start) else 0)
+
+        chunk = mm[start : end + 1]
+        if chunk[0] in _BLANK_BYTES or _MAYBE_BLANK_RE.search(chunk):
+            count += sum(1 for line in chunk.split(b"\n") if line.strip())
+        else:
+            count += chunk.count(b"\n")
+        start = end + 1
+    return count
 
 
 class NDJSONWriter:
@@ -20,7 +178,7 @@ class NDJSONWriter:
     - Daily log rotation (one file per day)
     - File locking for concurrent writes (Windows: msvcrt, Unix: fcntl)
     - Explicit flush after every write (crash resilience)
-    - Atomic appends
+    - Atomic appends (append_many writes a batch in one call)
 
     File naming: events_YYYYMMDD.ndjson
     Example: events_20251210.ndjson
@@ -38,6 +196,18 @@ class NDJSONWriter:
         # Ensure directory exists
         self.ndjson_dir.mkdir(parents=True, exist_ok=True)
 
+        # Today's file stays open between appends and is reopened when the
+        # date rolls over. The thread lock serializes appends in this
+        # process (the file lock only guards against other processes).
+        self._file = None
+        self._file_path: Optional[Path] = None
+        self._file_pid: Optional[int] = None
+        self._file_lock = threading.Lock()
+
+        # Daily file path, cached per UTC day (days since the epoch)
+        self._cached_day: Optional[int] = None
+        self._cached_path: Optional[Path] = None
+
     def _get_daily_file(self) -> Path:
         """
         Get the NDJSON file path for today.
@@ -48,9 +218,13 @@ class NDJSONWriter:
         Example:
             D:\\agent-metrics\\raw\\events_20251210.ndjson
         """
-        today = datetime.now(timezone.utc).strftime("%Y%m%d")
-        filename = f"events_{today}.ndjson"
-        return self.ndjson_dir / filename
+        # The path only changes at UTC midnight, so rebuild it once per day
+        day = int(time.time()) // 86400
+        if day != self._cached_day:
+            today = datetime.fromtimestamp(day * 86400, timezone.utc).strftime("%Y%m%d")
+            filename = f"events_{today}.ndjson"
+            self._cached_day, self._cached_path = day, self.ndjson_dir / filename
+        return self._cached_path
 
     def append(self, payload: Dict[str, Any]) -> tuple[bool, str]:
         """
@@ -62,42 +236,146 @@ class NDJSONWriter:
         Returns:
             Tuple of (success: bool, message: str)
         """
-        ndjson_file = self._get_daily_file()
+        return self.append_many([payload])
+
+    def append_many(self, payloads: List[Dict[str, Any]]) -> tuple[bool, str]:
+        """
+        Append several JSON objects to the daily NDJSON file in one write.
+
+        All records are serialized up front and written with a single
+        write() and fsync() under one lock acquisition, so a batch costs
+        the same locking and disk sync as a single append.
 
+        Args:
+            payloads: Dictionaries to write as JSON, one line each
+
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
         try:
-            # Open file in append mode
-            with open(ndjson_file, "a", encoding="utf-8") as f:
-                # Apply file lock based on platform
-                if sys.platform == "win32":
-                    # Windows file locking
-                    self._lock_windows(f)
-                else:
-                    # Unix/Linux file locking
-                    self._lock_unix(f)
+            # Serialize before locking so the lock is held only for the write
+            data = b"".join(_dumps_line(payload) for payload in payloads)
+        except Exception as e:
+            return False, f"[FAIL] NDJSON write error: {e}"
 
-                try:
-                    # Write JSON line
-                    json_line = json.dumps(payload)
-                    f.write(json_line + "\n")
+        if not data:
+            return True, "[OK] Nothing to write"
+
+        return self._write_data(data)
+
+    def _write_data(self, data: bytes) -> tuple[bool, str]:
+        """
+        Write serialized NDJSON lines to the daily file under the file lock.
 
-                    # Explicit flush (crash resilience per review feedback)
-                    f.flush()
+        Args:
+            data: One or more complete, newline-terminated JSON lines
 
-                    # Force to disk (fsync)
-                    os.fsync(f.fileno())
+        Returns:
+            Tuple of (success: bool, message: str)
+        """
+        try:
+            with self._file_lock:
+                try:
+                    f = self._open_daily_file()
 
-                finally:
-                    # Release lock
+                    # Apply file lock based on platform
                     if sys.platform == "win32":
-                        self._unlock_windows(f)
+                        # Windows file locking
+                        self._lock_windows(f)
                     else:
-                        self._unlock_unix(f)
+                        # Unix/Linux file locking
+                        self._lock_unix(f)
+
+                    try:
+                        # Write all JSON lines at once
+                        f.write(data)
+
+                        # Explicit flush (crash resilience per review feedback)
+                        f.flush()
 
-            return True, f"[OK] Wrote to {ndjson_file.name}"
+                        # Force to disk (fsync)
+                        os.fsync(f.fileno())
+
+                    finally:
+                        # Release lock
+                        if sys.platform == "win32":
+                            self._unlock_windows(f)
+                        else:
+                            self._unlock_unix(f)
+
+                except Exception:
+                    # Reopen on the next append rather than reuse a bad handle
+                    self._close_file()
+                    raise
+
+                return True, f"[OK] Wrote to {self._file_path.name}"
 
         except Exception as e:
             return False, f"[FAIL] NDJSON write error: {e}"
 
+    def _open_daily_file(self):
+        """
+        Return an append handle for today's file, reusing the open one.
+
+        The cached handle is reused only while the date is unchanged and the
+        path still refers to the same file; if the file was rotated or
+        removed externally, it is reopened (and recreated). A handle
+        inherited across os.fork() shares its open file description (and so
+        its flock) with the parent; it is dropped without closing and the
+        file is reopened.
+        Caller must hold self._file_lock.
+        """
+        path = self._get_daily_file()
+
+        if self._file is not None and self._file_pid != os.getpid():
+            self._file = None
+            self._file_path = None
+
+        if self._file is not None and path == self._file_path:
+            try:
+                on_disk = os.stat(path)
+                opened = os.fstat(self._file.fileno())
+                if (on_disk.st_dev, on_disk.st_ino) == (opened.st_dev, opened.st_ino):
+                    return self._file
+            except OSError:
+                pass
+
+        if self._file is not None and path != self._file_path and hasattr(os, "posix_fadvise"):
+            # The previous day's file is finished and every write was fsynced,
+            # so its pages are clean; drop them from the page cache
+            try:
+                os.posix_fadvise(self._file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+
+        self._close_file()
+        # Unbuffered: every write goes straight to the OS
+        self._file = open(path, "ab", buffering=0)
+        self._file_path = path
+        self._file_pid = os.getpid()
+        return self._file
+
+    def _close_file(self):
+        """Close the cached file handle, if any. Caller must hold self._file_lock."""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+            self._file_path = None
+
+    def close(self):
+        """Close the open daily file. Safe to call more than once."""
+        with self._file_lock:
+            self._close_file()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def _lock_windows(self, file_handle):
         """
         Lock file on Windows using msvcrt.
@@ -175,19 +453,36 @@ class NDJSONWriter:
         if not filepath.exists():
             raise FileNotFoundError(f"NDJSON file not found: {filepath}")
 
-        records = []
+        # mmap rejects empty files
+        if filepath.stat().st_size == 0:
+            return []
 
-        with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if line:  # Skip empty lines
-                    try:
-                        record = json.loads(line)
-                        records.append(record)
-                    except json.JSONDecodeError as e:
-                        # Log error but continue
-                        print(f"Warning: Invalid JSON line: {e}")
-                        continue
+        # Map the file instead of reading it through a text wrapper; lines are
+        # parsed straight from bytes
+        with open(filepath, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+
+                stripped = (line.strip() for line in iter(mm.readline, b""))
+                lines = [line for line in stripped if line]  # Skip empty lines
+
+        # Parse every line on its own in one comprehension; only if a line is
+        # invalid, go through them again to skip and report the bad ones
+        try:
+            return [_loads(line) for line in lines]
+        except ValueError:
+            pass
+
+        records = []
+        for line in lines:
+            try:
+                record = _loads(line)
+                records.append(record)
+            except ValueError as e:
+                # Invalid JSON or UTF-8: log error but continue
+                print(f"Warning: Invalid JSON line: {e}")
+                continue
 
         return records
 
@@ -198,9 +493,15 @@ class NDJSONWriter:
         Returns:
             List of Path objects, sorted by filename
         """
-        pattern = "events_*.ndjson"
-        files = list(self.ndjson_dir.glob(pattern))
-        return sorted(files)
+        # Same match as glob("events_*.ndjson"), filtered on DirEntry names
+        with os.scandir(self.ndjson_dir) as entries:
+            files = [
+                Path(entry.path)
+                for entry in entries
+                if entry.name.startswith("events_") and entry.name.endswith(".ndjson")
+            ]
+        files.sort(key=lambda path: path.name)
+        return files
 
     def get_file_info(self, filepath: Path) -> Dict[str, Any]:
         """
@@ -218,12 +519,12 @@ class NDJSONWriter:
         # Get file size
         size_bytes = filepath.stat().st_size
 
-        # Count lines
+        # Count non-blank lines over the mapped file (mmap rejects empty files)
         line_count = 0
-        with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    line_count += 1
+        if size_bytes:
+            with open(filepath, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    line_count = _count_nonblank_lines(mm)
 
         return {
             "filename": filepath.name,
@@ -231,3 +532,120 @@ class NDJSONWriter:
             "line_count": line_count,
             "path": str(filepath),
         }
+
+
+class BackgroundNDJSONWriter(NDJSONWriter):
+    """
+    NDJSONWriter that moves file writes off the caller's thread.
+
+    append()/append_many() only serialize the records and queue the bytes;
+    a daemon thread drains the queue and writes each batch with one write()
+    and fsync(). The queue is bounded: when it is full the oldest queued
+    record is dropped and counted in ``dropped``.
+
+    A writer that is never closed is closed at interpreter exit, so queued
+    records are written on a normal exit. They are still lost if the
+    process crashes before flush() or close(), so TelemetryClient keeps the
+    synchronous NDJSONWriter. Use this only where losing the newest few
+    events on a crash is acceptable.
+    """
+
+    def __init__(self, ndjson_dir: Path, max_pending: int = 4096):
+        """
+        Initialize the writer and start its background thread.
+
+        Args:
+            ndjson_dir: Directory where NDJSON files will be written
+            max_pending: Maximum queued records before the oldest is dropped
+        """
+        super().__init__(ndjson_dir)
+
+        self._pending: deque = deque(maxlen=max_pending)
+        self._in_flight = 0  # Records taken by the worker but not yet written
+        self._closed = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+        self._worker = threading.Thread(target=self._run, name="ndjson-writer", daemon=True)
+        self._worker.start()
+
+        # The daemon worker holds a reference to self, so __del__ never runs
+        # while it is alive; close at exit so queued records are written
+        atexit.register(self.close)
+
+    def append_many(self, payloads: List[Dict[str, Any]]) -> tuple[bool, str]:
+        """
+        Queue JSON objects for the background thread to write.
+
+        Args:
+            payloads: Dictionaries to write as JSON, one line each
+
+        Returns:
+            Tuple of (success: bool, message: str); success means queued
+        """
+        try:
+            # Serialize now so later changes to the dicts don't leak in
+            lines = [_dumps_line(payload) for payload in payloads]
+        except Exception as e:
+            return False, f"[FAIL] NDJSON write error: {e}"
+
+        with self._cond:
+            if self._closed:
+                return False, "[FAIL] NDJSON writer is closed"
+
+            for line in lines:
+                if len(self._pending) == self._pending.maxlen:
+                    self.dropped += 1
+                self._pending.append(line)
+
+            self._cond.notify_all()
+
+        return True, f"[OK] Queued {len(lines)} record(s)"
+
+    def _run(self):
+        """Drain queued lines in batches until closed and empty."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+
+                if not self._pending:
+                    return
+
+                batch = list(self._pending)
+                self._pending.clear()
+                self._in_flight = len(batch)
+
+            success, message = self._write_data(b"".join(batch))
+            if not success:
+                print(f"Warning: {message} ({len(batch)} records lost)")
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued record has been written.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self):
+        """Write any queued records, stop the thread and close the file."""
+        atexit.unregister(self.close)
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        if self._worker.is_alive() and self._worker is not threading.current_thread():
+            self._worker.join()
+
+        super().close()
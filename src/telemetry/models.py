@@ -14,8 +14,9 @@ KEY FIELDS:
 - git_commit_timestamp: When the commit was made (ISO8601)
 """
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
+from functools import cache
 from typing import Optional, Dict, Any
 import json
 import uuid
@@ -31,6 +32,28 @@ import uuid
 SCHEMA_VERSION = 7
 
 
+@cache
+def _field_names(cls) -> frozenset:
+    """Dataclass field names, computed once per class."""
+    return frozenset(f.name for f in fields(cls))
+
+
+@cache
+def _field_order(cls) -> tuple:
+    """Dataclass field names in declaration order, computed once per class."""
+    return tuple(f.name for f in fields(cls))
+
+
+def _flat_dict(obj) -> Dict[str, Any]:
+    """
+    Shallow dict of a dataclass whose fields are all scalars.
+
+    Equivalent to dataclasses.asdict() for these models, but skips its
+    per-field recursion and deepcopy() calls.
+    """
+    return {name: getattr(obj, name) for name in _field_order(type(obj))}
+
+
 @dataclass
 class RunRecord:
     """
@@ -88,7 +111,7 @@ class RunRecord:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for database insertion."""
-        data = asdict(self)
+        data = _flat_dict(self)
         data["record_type"] = "run"
         return data
 
@@ -100,8 +123,7 @@ class RunRecord:
     def from_dict(cls, data: Dict[str, Any]) -> "RunRecord":
         """Create RunRecord from dictionary."""
         # Get valid field names from dataclass
-        import dataclasses
-        valid_fields = {f.name for f in dataclasses.fields(cls)}
+        valid_fields = _field_names(cls)
 
         # Filter out fields not in the dataclass (like 'record_type', 'custom_metadata', etc.)
         filtered_data = {k: v for k, v in data.items() if k in valid_fields}
@@ -131,7 +153,7 @@ class RunEvent:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        data = asdict(self)
+        data = _flat_dict(self)
         data["record_type"] = "event"
         return data
 
@@ -185,7 +207,7 @@ class APIPayload:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for API posting, excluding None values."""
-        data = asdict(self)
+        data = _flat_dict(self)
         # Filter out None values for cleaner API payloads
         return {k: v for k, v in data.items() if v is not None}
 
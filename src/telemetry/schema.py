@@ -20,9 +20,10 @@ SCHEMA VERSION 4 CHANGES:
 - Added git_commit_timestamp column for when commit was made
 """
 
+import os
 import sqlite3
 from pathlib import Path
-from typing import Tuple
+from typing import Tuple, Union
 
 # Schema version for migrations
 # v2: Added insight_id column for SEO Intelligence integration
@@ -122,6 +123,7 @@ INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_runs_agent_status_created ON agent_runs(agent_name, status, created_at DESC)",  # v2.1.0: Composite index for stale run detection
     "CREATE INDEX IF NOT EXISTS idx_runs_agent_created ON agent_runs(agent_name, created_at DESC)",  # v2.1.0: Composite index for time-range queries
     "CREATE INDEX IF NOT EXISTS idx_runs_api_posted ON agent_runs(api_posted)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_pending_api ON agent_runs(api_posted, start_time) WHERE api_posted = 0",  # Partial index for the pending API queue in start_time order
     "CREATE INDEX IF NOT EXISTS idx_runs_insight ON agent_runs(insight_id)",  # For SEO Intelligence queries
     "CREATE INDEX IF NOT EXISTS idx_runs_commit ON agent_runs(git_commit_hash)",  # For commit-based lookups
     "CREATE INDEX IF NOT EXISTS idx_runs_website ON agent_runs(website)",  # For website-based queries
@@ -131,25 +133,37 @@ INDEXES = [
 ]
 
 
-def create_schema(db_path: str) -> Tuple[bool, list[str]]:
+def _connect(db_path: str) -> sqlite3.Connection:
+    """
+    Open a database path or SQLite URI.
+
+    Paths starting with ``file:`` are opened as URIs, which allows callers
+    (mainly tests) to use shared in-memory databases such as
+    ``file:name?mode=memory&cache=shared``.
+    """
+    return sqlite3.connect(db_path, uri=db_path.startswith("file:"))
+
+
+def create_schema(db_path: Union[str, os.PathLike]) -> Tuple[bool, list[str]]:
     """
     Create the telemetry database schema.
 
     Args:
-        db_path: Path to SQLite database file
+        db_path: Path to SQLite database file (str or PathLike), or a ``file:`` URI
 
     Returns:
         Tuple of (success: bool, messages: list[str])
     """
+    db_path = os.fspath(db_path)
     messages = []
 
     try:
-        # Ensure parent directory exists
-        db_file = Path(db_path)
-        db_file.parent.mkdir(parents=True, exist_ok=True)
+        # Ensure parent directory exists (URIs manage their own storage)
+        if not db_path.startswith("file:"):
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
         # Connect to database
-        conn = sqlite3.connect(db_path)
+        conn = _connect(db_path)
         cursor = conn.cursor()
 
         # Enable DELETE mode for Docker volume mount compatibility
@@ -198,18 +212,19 @@ def create_schema(db_path: str) -> Tuple[bool, list[str]]:
         return False, messages
 
 
-def get_schema_version(db_path: str) -> int:
+def get_schema_version(db_path: Union[str, os.PathLike]) -> int:
     """
     Get the current schema version from the database.
 
     Args:
-        db_path: Path to SQLite database file
+        db_path: Path to SQLite database file (str or PathLike), or a ``file:`` URI
 
     Returns:
         int: Current schema version, or 0 if not found
     """
+    db_path = os.fspath(db_path)
     try:
-        conn = sqlite3.connect(db_path)
+        conn = _connect(db_path)
         cursor = conn.cursor()
 
         cursor.execute(
@@ -224,16 +239,17 @@ def get_schema_version(db_path: str) -> int:
         return 0
 
 
-def verify_schema(db_path: str) -> Tuple[bool, list[str]]:
+def verify_schema(db_path: Union[str, os.PathLike]) -> Tuple[bool, list[str]]:
     """
     Verify that the database schema is correctly created.
 
     Args:
-        db_path: Path to SQLite database file
+        db_path: Path to SQLite database file (str or PathLike)
 
     Returns:
         Tuple of (success: bool, messages: list[str])
     """
+    db_path = os.fspath(db_path)
     messages = []
     all_ok = True
 
@@ -318,12 +334,12 @@ def verify_schema(db_path: str) -> Tuple[bool, list[str]]:
         return False, messages
 
 
-def export_schema_sql(output_path: str) -> Tuple[bool, str]:
+def export_schema_sql(output_path: Union[str, os.PathLike]) -> Tuple[bool, str]:
     """
     Export the schema as a SQL file.
 
     Args:
-        output_path: Path where SQL file should be written
+        output_path: Path where SQL file should be written (str or PathLike)
 
     Returns:
         Tuple of (success: bool, message: str)
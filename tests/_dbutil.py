@@ -0,0 +1,82 @@
+"""
+Database helpers shared by the telemetry unit tests.
+
+Paths starting with ``file:`` are opened as SQLite URIs so the same helpers
+work for on-disk databases and shared-cache in-memory databases.
+
+If the optional ``apsw`` package is installed, fetch_all() uses it for
+on-disk databases; its thinner binding skips the sqlite3 cursor wrapper.
+"""
+
+import hashlib
+import sqlite3
+from contextlib import closing, contextmanager
+
+try:
+    import apsw
+
+    HAS_APSW = True
+except ImportError:
+    HAS_APSW = False
+
+
+def connect(db_path, **kwargs) -> sqlite3.Connection:
+    """Open a database path or ``file:`` URI."""
+    return sqlite3.connect(db_path, uri=str(db_path).startswith("file:"), **kwargs)
+
+
+def open_test_conn(db_path, **kwargs) -> sqlite3.Connection:
+    """
+    Open a connection tuned for throwaway test databases.
+
+    Test databases are discarded after each test, so durability is not needed:
+    synchronous=OFF and journal_mode=MEMORY remove fsync and journal file I/O.
+    journal_mode=MEMORY applies to this connection only, so the on-disk file
+    keeps the DELETE mode that create_schema() sets.
+    """
+    conn = connect(db_path, **kwargs)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def fetch_all(db_path, sql: str, params=()) -> list:
+    """Run one query on a short-lived connection and return all rows as tuples."""
+    db_path = str(db_path)
+    # apsw wheels bundle their own SQLite, so they cannot see shared-cache
+    # in-memory databases opened through the sqlite3 module; keep URIs on sqlite3.
+    if HAS_APSW and not db_path.startswith("file:"):
+        conn = apsw.Connection(db_path)
+        try:
+            return list(conn.cursor().execute(sql, params))
+        finally:
+            conn.close()
+
+    with closing(connect(db_path)) as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def fast_create(db_path, template: sqlite3.Connection) -> None:
+    """Materialize a schema database at db_path by copying the session template."""
+    with closing(connect(db_path)) as dst:
+        template.backup(dst)
+
+
+@contextmanager
+def shared_memory_db(name: str, template: sqlite3.Connection = None):
+    """
+    Shared-cache in-memory database that lives for the duration of the block.
+
+    Yields its ``file:`` URI. A keeper connection holds the database open,
+    since SQLite drops a shared in-memory database when its last connection
+    closes. ``name`` (e.g. a test node id) is hashed, so brackets and spaces
+    from parametrized ids never end up in the URI. If ``template`` is given,
+    its schema is copied in with Connection.backup().
+    """
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
+    uri = f"file:memdb_{digest}?mode=memory&cache=shared"
+    with closing(connect(uri)) as keeper:
+        if template is not None:
+            template.backup(keeper)
+        yield uri
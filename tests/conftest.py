@@ -1,11 +1,122 @@
 """
 Pytest configuration and fixtures for telemetry tests.
 """
+import os
+import sqlite3
 import sys
 from pathlib import Path
 
-# Add src directory to Python path for imports
+import pytest
+
+# Add src directory to Python path for imports, and scripts/ (appended, so it
+# never shadows an installed module) for tests of the maintenance scripts.
+# Done once here rather than inside individual tests.
 project_root = Path(__file__).parent.parent
 src_path = project_root / "src"
 if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
+scripts_path = project_root / "scripts"
+if str(scripts_path) not in sys.path:
+    sys.path.append(str(scripts_path))
+
+
+@pytest.fixture(scope="session")
+def schema_template(tmp_path_factory):
+    """
+    In-memory database holding the full telemetry schema, built once per session.
+
+    The schema is created with schema.create_schema() on a real file (so the
+    template matches production exactly) and then copied into memory. Tests
+    materialize their own database from it with Connection.backup(), which
+    copies pages instead of re-parsing every CREATE TABLE/INDEX statement.
+
+    Under pytest-xdist each worker process builds its own template, so no
+    SQLite file is shared between workers.
+    """
+    from telemetry import schema
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    db_path = tmp_path_factory.mktemp(f"schema_template_{worker}") / "template.db"
+    success, messages = schema.create_schema(str(db_path))
+    assert success, messages
+
+    source = sqlite3.connect(db_path)
+    template = sqlite3.connect(":memory:")
+    source.backup(template)
+    source.close()
+
+    yield template
+
+    template.close()
+
+
+@pytest.fixture(scope="session")
+def v7_schema_template(tmp_path_factory):
+    """
+    In-memory database built from the schema/telemetry_v7.sql export.
+
+    The SQL export is the full production schema, including the columns
+    DatabaseWriter inserts (items_skipped, source_ref, context_json, ...)
+    that schema.TABLES does not define yet. Writer tests copy it with
+    Connection.backup(), the same way as schema_template.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "master")
+    db_path = tmp_path_factory.mktemp(f"v7_schema_template_{worker}") / "template.db"
+    source = sqlite3.connect(db_path)
+    source.executescript((project_root / "schema" / "telemetry_v7.sql").read_text())
+
+    template = sqlite3.connect(":memory:")
+    source.backup(template)
+    source.close()
+
+    yield template
+
+    template.close()
+
+
+@pytest.fixture(scope="class")
+def class_tmp_dir(request, tmp_path_factory):
+    """One temp directory per test class, for tests that only need unique file names."""
+    return tmp_path_factory.mktemp(request.cls.__name__)
+
+
+def pytest_itemcollected(item):
+    """
+    Put every @pytest.mark.serial test in one pytest-xdist group.
+
+    With ``-n auto --dist=loadgroup`` all serial tests then run on a single
+    worker, one after another, while the rest of the suite is distributed.
+    The marker is only added when xdist is loaded, since ``xdist_group`` is
+    unregistered otherwise and --strict-markers would reject it.
+    """
+    if not item.config.pluginmanager.hasplugin("xdist"):
+        return
+
+    if item.get_closest_marker("serial") is not None:
+        item.add_marker(pytest.mark.xdist_group("serial"))
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Keep tests from the same module and class adjacent.
+
+    Ordering plugins (e.g. pytest-randomly) may interleave items; grouping them
+    keeps session/class fixtures such as schema_template warm and lets similar
+    SQLite work reuse the OS page cache. Groups keep their first-seen order and
+    items keep their relative order within a group, so any shuffle is preserved.
+    Without an ordering plugin the collection order is left untouched.
+    """
+    if not config.pluginmanager.hasplugin("randomly"):
+        return
+
+    group_order = {}
+    for item in items:
+        key = (getattr(item, "module", None), getattr(item, "cls", None))
+        group_order.setdefault(key, len(group_order))
+
+    items.sort(
+        key=lambda item: group_order[
+            (getattr(item, "module", None), getattr(item, "cls", None))
+        ]
+    )
@@ -5,6 +5,7 @@ Tests verify that TelemetryClient can write to both NDJSON and SQLite,
 and that data is consistent between both stores.
 """
 
+import functools
 import json
 import sqlite3
 from datetime import datetime, timezone
@@ -15,20 +16,63 @@ import pytest
 from telemetry import TelemetryClient, TelemetryConfig
 
 
-@pytest.fixture
+@functools.cache
+def _config() -> TelemetryConfig:
+    """Load TelemetryConfig from the environment once."""
+    return TelemetryConfig.from_env()
+
+
+@pytest.fixture(scope="module")
 def telemetry_client():
-    """Create a TelemetryClient with real config."""
-    config = TelemetryConfig.from_env()
-    return TelemetryClient(config)
+    """
+    TelemetryClient with real config, shared by the tests in this module.
+
+    Every test starts its own run, so the generated run_id keeps the tests
+    isolated.
+    """
+    config = _config()
+    with TelemetryClient(config) as client:
+        yield client
 
 
 def get_ndjson_file_path() -> Path:
     """Get today's NDJSON file path."""
-    config = TelemetryConfig.from_env()
+    config = _config()
     today = datetime.now(timezone.utc).strftime("%Y%m%d")
     return config.ndjson_dir / f"events_{today}.ndjson"
 
 
+# Records of the current NDJSON file grouped by run_id, plus how far into
+# the file they have been parsed. The file is append-only, so each lookup
+# only parses what was written since the previous one.
+_ndjson_index = {"file": None, "offset": 0, "records": {}}
+
+
+def _index_ndjson(ndjson_path: Path) -> dict:
+    """Bring the run_id index up to date with the end of ndjson_path."""
+    stat = ndjson_path.stat()
+    file_id = (ndjson_path, stat.st_dev, stat.st_ino)
+
+    # New day, replaced file or truncation: start over
+    if _ndjson_index["file"] != file_id or stat.st_size < _ndjson_index["offset"]:
+        _ndjson_index.update(file=file_id, offset=0, records={})
+
+    if stat.st_size > _ndjson_index["offset"]:
+        with open(ndjson_path, 'rb') as f:
+            f.seek(_ndjson_index["offset"])
+            data = f.read()
+
+        # Only index complete lines; a partial last line is picked up next time
+        complete = data.rfind(b'\n') + 1
+        for line in data[:complete].splitlines():
+            if line.strip():
+                record = json.loads(line)
+                _ndjson_index["records"].setdefault(record.get('run_id'), []).append(record)
+        _ndjson_index["offset"] += complete
+
+    return _ndjson_index["records"]
+
+
 def read_ndjson_records(run_id: str) -> list:
     """Read NDJSON records for a specific run_id."""
     ndjson_path = get_ndjson_file_path()
@@ -36,20 +80,12 @@ def read_ndjson_records(run_id: str) -> list:
     if not ndjson_path.exists():
         return []
 
-    records = []
-    with open(ndjson_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line.strip():
-                record = json.loads(line)
-                if record.get('run_id') == run_id:
-                    records.append(record)
-
-    return records
+    return list(_index_ndjson(ndjson_path).get(run_id, []))
 
 
 def read_sqlite_record(run_id: str) -> dict:
     """Read a record from SQLite by run_id."""
-    config = TelemetryConfig.from_env()
+    config = _config()
     conn = sqlite3.connect(str(config.database_path))
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
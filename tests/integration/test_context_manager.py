@@ -14,11 +14,17 @@ import pytest
 from telemetry import TelemetryClient, TelemetryConfig
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def telemetry_client():
-    """Create a TelemetryClient with real config."""
+    """
+    TelemetryClient with real config, shared by the tests in this module.
+
+    Every test starts its own run, so the generated run_id keeps the tests
+    isolated.
+    """
     config = TelemetryConfig.from_env()
-    return TelemetryClient(config)
+    with TelemetryClient(config) as client:
+        yield client
 
 
 def read_sqlite_record(run_id: str) -> dict:
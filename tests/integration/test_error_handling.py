@@ -4,7 +4,6 @@ Integration tests for error handling and graceful degradation.
 Verifies that telemetry errors don't crash agent applications.
 """
 
-import os
 import sqlite3
 import tempfile
 from pathlib import Path
@@ -114,35 +113,23 @@ class TestErrorHandling:
         assert "Math error" in row[1] or "ValueError" in row[1]
         conn.close()
 
-    def test_telemetry_without_environment_variable(self):
+    def test_telemetry_without_environment_variable(self, monkeypatch):
         """Test that telemetry works without AGENT_METRICS_DIR set."""
-        # Temporarily unset environment variable
-        original_value = os.environ.get("AGENT_METRICS_DIR")
+        # Unset for this test only; monkeypatch restores the original value
+        monkeypatch.delenv("AGENT_METRICS_DIR", raising=False)
 
-        try:
-            if "AGENT_METRICS_DIR" in os.environ:
-                del os.environ["AGENT_METRICS_DIR"]
-
-            # Should fall back to D:\ or C:\ detection
-            config = TelemetryConfig.from_env()
-            assert config.metrics_dir is not None
+        # Should fall back to D:\ or C:\ detection
+        config = TelemetryConfig.from_env()
+        assert config.metrics_dir is not None
 
-            client = TelemetryClient(config)
+        client = TelemetryClient(config)
 
-            # Should still work
-            with client.track_run(
-                agent_name="test_agent",
-                job_type="test_no_env_var"
-            ) as run_ctx:
-                run_ctx.set_metrics(items_discovered=5)
-
-        finally:
-            # Restore environment variable
-            if original_value:
-                os.environ["AGENT_METRICS_DIR"] = original_value
-            else:
-                # Make sure it's set for subsequent tests
-                os.environ["AGENT_METRICS_DIR"] = "D:\\agent-metrics"
+        # Should still work
+        with client.track_run(
+            agent_name="test_agent",
+            job_type="test_no_env_var"
+        ) as run_ctx:
+            run_ctx.set_metrics(items_discovered=5)
 
     def test_concurrent_writes_dont_deadlock(self):
         """Test that concurrent writes don't deadlock."""
@@ -377,6 +377,42 @@ class TestSyncAPIPosting:
         assert success is False
         assert "request error" in message.lower()
 
+    @patch("telemetry.api.httpx")
+    def test_post_run_sync_reuses_http_client(self, mock_httpx):
+        """Test repeat posts share one httpx.Client until close()."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+
+        mock_client = MagicMock()
+        mock_client.post.return_value = mock_response
+
+        mock_httpx.Client.return_value = mock_client
+
+        client = APIClient(
+            google_sheets_api_url="https://api.example.com",
+            api_token="test-token",
+            google_sheets_api_enabled=True,
+        )
+
+        payload = APIPayload(
+            run_id="test-123",
+            agent_name="test_agent",
+            job_type="test_job",
+            trigger_type="cli",
+            start_time=get_iso8601_timestamp(),
+            status="success",
+        )
+
+        for _ in range(3):
+            success, _ = client.post_run_sync(payload)
+            assert success is True
+
+        assert mock_httpx.Client.call_count == 1
+        assert mock_client.post.call_count == 3
+
+        client.close()
+        mock_client.close.assert_called_once()
+
     def test_post_run_sync_httpx_not_installed(self):
         """Test behavior when httpx is not installed."""
         with patch("telemetry.api.httpx", None):
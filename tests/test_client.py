@@ -36,24 +36,18 @@ from telemetry.models import RunRecord
 
 @pytest.fixture
 def temp_telemetry_dir(tmp_path):
-    """Create temporary directory for telemetry files."""
-    metrics_dir = tmp_path / "metrics"
-    metrics_dir.mkdir(parents=True, exist_ok=True)
-
-    ndjson_dir = metrics_dir / "raw"
-    ndjson_dir.mkdir(parents=True, exist_ok=True)
-
-    buffer_dir = metrics_dir / "buffer"
-    buffer_dir.mkdir(parents=True, exist_ok=True)
-
-    db_dir = metrics_dir / "db"
-    db_dir.mkdir(parents=True, exist_ok=True)
+    """
+    Paths for telemetry files under tmp_path.
 
+    The directories are not created here; TelemetryClient creates each one
+    on first use.
+    """
+    metrics_dir = tmp_path / "metrics"
     return {
         "metrics_dir": metrics_dir,
-        "ndjson_dir": ndjson_dir,
-        "buffer_dir": buffer_dir,
-        "database_path": db_dir / "telemetry.sqlite",
+        "ndjson_dir": metrics_dir / "raw",
+        "buffer_dir": metrics_dir / "buffer",
+        "database_path": metrics_dir / "db" / "telemetry.sqlite",
     }
 
 
@@ -142,6 +136,17 @@ class TestTelemetryClientCreation:
         assert "[WARN]" in captured.out
         assert "configuration issues" in captured.out
 
+    def test_client_close_releases_database_connection(self, test_config):
+        """Test close() (via the context manager) drops the cached SQLite connection."""
+        with TelemetryClient(test_config) as client:
+            client.database_writer._get_connection()
+            assert client.database_writer._local.conn is not None
+
+        assert client.database_writer._local.conn is None
+
+        # Closing twice is harmless
+        client.close()
+
 
 class TestClientSelection:
     """Test client selection logic based on configuration (TS-02)."""
@@ -282,6 +287,28 @@ class TestStartRun:
         assert run_id is not None
 
 
+class TestCustomRunIdValidation:
+    """Test _validate_custom_run_id rules and rejection reasons."""
+
+    @pytest.mark.parametrize(
+        "run_id, expected",
+        [
+            ("my-run.2025_01", (True, None)),
+            ("run with spaces:and-colons", (True, None)),
+            ("x" * 255, (True, None)),
+            ("", (False, "empty")),
+            ("   ", (False, "empty")),
+            ("x" * 256, (False, "too_long")),
+            ("a/b", (False, "invalid_chars")),
+            ("a\\b", (False, "invalid_chars")),
+            ("a\x00b", (False, "invalid_chars")),
+        ],
+    )
+    def test_validate_custom_run_id(self, client, run_id, expected):
+        """Test each run_id is accepted or rejected with the right reason."""
+        assert client._validate_custom_run_id(run_id) == expected
+
+
 class TestEndRun:
     """Test explicit end_run method."""
 
@@ -41,13 +41,13 @@ class TestTelemetryConfigCreation:
         assert config.ndjson_dir is not None
         assert config.api_enabled is True
 
+    @pytest.mark.skipif(sys.platform != "win32", reason="Drive letters only exist on Windows")
     def test_config_detects_drive(self):
         """Test that config uses real drive detection (D: if exists, else C:)."""
         config = TelemetryConfig.from_env()
 
         # Should use either D: or C: based on what actually exists
-        metrics_str = str(config.metrics_dir)
-        assert metrics_str.startswith("D:") or metrics_str.startswith("C:")
+        assert config.metrics_dir.drive in ("D:", "C:")
 
     def test_config_custom_metrics_dir(self, monkeypatch, tmp_path):
         """Test config with custom METRICS_DIR using REAL temp directory."""
@@ -92,6 +92,23 @@ class TestAPIConfiguration:
 
         assert config.api_url == "https://api.example.com/metrics"
 
+    def test_empty_api_url_is_kept(self, monkeypatch):
+        """Test that an empty METRICS_API_URL is not replaced by the default."""
+        monkeypatch.delenv("TELEMETRY_API_URL", raising=False)
+        monkeypatch.setenv("METRICS_API_URL", "")
+        config = TelemetryConfig.from_env()
+
+        assert config.api_url == ""
+
+    def test_empty_retry_backoff_factor_warns(self, monkeypatch, caplog):
+        """Test that an empty TELEMETRY_RETRY_BACKOFF_FACTOR is reported as invalid."""
+        monkeypatch.setenv("TELEMETRY_RETRY_BACKOFF_FACTOR", "")
+        with caplog.at_level("WARNING", logger="telemetry.config"):
+            config = TelemetryConfig.from_env()
+
+        assert config.retry_backoff_factor == 1.0
+        assert "Invalid TELEMETRY_RETRY_BACKOFF_FACTOR" in caplog.text
+
     def test_api_token_from_env(self, monkeypatch):
         """Test setting API token from REAL environment variable."""
         monkeypatch.setenv("METRICS_API_TOKEN", "secret-token-123")
@@ -172,6 +189,17 @@ class TestTestModeConfiguration:
 class TestConfigValidation:
     """Test configuration validation using REAL file system."""
 
+    @pytest.fixture
+    def validate_joined(self):
+        """Validate config from REAL environment, joining errors into one searchable string."""
+
+        def _validate():
+            config = TelemetryConfig.from_env()
+            is_valid, errors = config.validate()
+            return is_valid, errors, "\n".join(errors)
+
+        return _validate
+
     def test_validate_fully_configured(self, monkeypatch, tmp_path):
         """Test validation with fully configured setup using REAL directories."""
         # Create real directories
@@ -191,69 +219,64 @@ class TestConfigValidation:
         assert is_valid is True
         assert len(errors) == 0
 
-    def test_validate_api_enabled_without_url(self, monkeypatch):
+    def test_validate_api_enabled_without_url(self, monkeypatch, validate_joined):
         """Test validation when API is enabled but URL is missing."""
         monkeypatch.setenv("METRICS_API_ENABLED", "true")
         monkeypatch.setenv("METRICS_API_TOKEN", "token123")
         monkeypatch.delenv("METRICS_API_URL", raising=False)
 
-        config = TelemetryConfig.from_env()
-        is_valid, errors = config.validate()
+        is_valid, errors, errors_text = validate_joined()
 
         assert is_valid is False
-        assert any("METRICS_API_URL" in error for error in errors)
+        assert "METRICS_API_URL" in errors_text
 
-    def test_validate_api_enabled_without_token(self, monkeypatch):
+    def test_validate_api_enabled_without_token(self, monkeypatch, validate_joined):
         """Test validation when API is enabled but token is missing."""
         monkeypatch.setenv("METRICS_API_ENABLED", "true")
         monkeypatch.setenv("METRICS_API_URL", "https://api.example.com")
         monkeypatch.delenv("METRICS_API_TOKEN", raising=False)
 
-        config = TelemetryConfig.from_env()
-        is_valid, errors = config.validate()
+        is_valid, errors, errors_text = validate_joined()
 
         assert is_valid is False
-        assert any("METRICS_API_TOKEN" in error for error in errors)
+        assert "METRICS_API_TOKEN" in errors_text
 
-    def test_validate_api_disabled_no_warnings(self, monkeypatch):
+    def test_validate_api_disabled_no_warnings(self, monkeypatch, validate_joined):
         """Test validation when API is disabled (should not complain about missing URL/token)."""
         monkeypatch.setenv("METRICS_API_ENABLED", "false")
         monkeypatch.delenv("METRICS_API_URL", raising=False)
         monkeypatch.delenv("METRICS_API_TOKEN", raising=False)
 
-        config = TelemetryConfig.from_env()
-        is_valid, errors = config.validate()
+        is_valid, errors, errors_text = validate_joined()
 
         # Should be valid (or only have non-API-related errors)
         # No errors about missing API URL/token
-        assert not any("METRICS_API_URL" in error for error in errors)
-        assert not any("METRICS_API_TOKEN" in error for error in errors)
+        assert "METRICS_API_URL" not in errors_text
+        assert "METRICS_API_TOKEN" not in errors_text
 
-    def test_validate_missing_agent_owner(self, monkeypatch):
+    def test_validate_missing_agent_owner(self, monkeypatch, validate_joined):
         """Test validation when agent_owner is missing (agent_owner is optional, so no error expected)."""
         monkeypatch.setenv("METRICS_API_URL", "https://api.example.com")
         monkeypatch.setenv("METRICS_API_TOKEN", "token123")
         monkeypatch.delenv("AGENT_OWNER", raising=False)
 
-        config = TelemetryConfig.from_env()
-        is_valid, errors = config.validate()
+        is_valid, errors, errors_text = validate_joined()
 
         # agent_owner is optional, so no validation error expected for it being missing
-        assert not any("AGENT_OWNER" in error for error in errors)
+        assert "AGENT_OWNER" not in errors_text
 
-    def test_validate_returns_all_errors(self, monkeypatch):
+    def test_validate_returns_all_errors(self, monkeypatch, validate_joined):
         """Test that validation returns all errors at once."""
         monkeypatch.setenv("METRICS_API_ENABLED", "true")
         monkeypatch.delenv("METRICS_API_URL", raising=False)
         monkeypatch.delenv("METRICS_API_TOKEN", raising=False)
 
-        config = TelemetryConfig.from_env()
-        is_valid, errors = config.validate()
+        is_valid, errors, errors_text = validate_joined()
 
         # Should have multiple errors
         assert len(errors) >= 2
-        assert any("METRICS_API_URL" in error for error in errors)
-        assert any("METRICS_API_TOKEN" in error for error in errors)
+        assert "METRICS_API_URL" in errors_text
+        assert "METRICS_API_TOKEN" in errors_text
 
 
 class TestConfigRepresentation:
@@ -0,0 +1,416 @@
+"""
+Tests for database schema module - creation, verification and constraints.
+
+Verifies that the telemetry database schema can be created correctly.
+Every test here performs real SQLite I/O, so the module is marked
+requires_db.
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for importing telemetry package
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from telemetry import schema
+from tests._dbutil import fast_create, fetch_all, open_test_conn, shared_memory_db
+
+pytestmark = pytest.mark.requires_db
+
+
+def _found(messages, needles):
+    """True if every needle appears in some message (messages are joined and scanned once)."""
+    joined = "\n".join(messages)
+    return all(needle in joined for needle in needles)
+
+
+@pytest.fixture
+def mem_db_uri(request):
+    """
+    Shared-cache in-memory database URI unique to the requesting test.
+
+    A keeper connection stays open for the duration of the test; SQLite drops
+    a shared in-memory database as soon as its last connection closes.
+    """
+    with shared_memory_db(request.node.nodeid) as uri:
+        yield uri
+
+
+@pytest.fixture
+def db_paths(tmp_path):
+    """(str, Path) pair for a test database; the string form is computed once."""
+    db_path = tmp_path / "test.db"
+    return os.fspath(db_path), db_path
+
+
+class TestCreateSchema:
+    """Test schema creation function."""
+
+    def test_creates_database_file(self, db_paths):
+        """Should create database file if it doesn't exist."""
+        path_str, db_path = db_paths
+
+        success, messages = schema.create_schema(path_str)
+
+        assert success
+        assert db_path.exists()
+
+    def test_creates_all_tables(self, mem_db_uri):
+        """Should create all required tables."""
+        schema.create_schema(mem_db_uri)
+
+        rows = fetch_all(
+            mem_db_uri, "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
+        )
+        tables = {row[0] for row in rows}
+
+        assert "agent_runs" in tables
+        assert "run_events" in tables
+        assert "commits" in tables
+        assert "schema_migrations" in tables
+
+    def test_creates_all_indexes(self, mem_db_uri):
+        """Should create all required indexes."""
+        schema.create_schema(mem_db_uri)
+
+        rows = fetch_all(
+            mem_db_uri, "SELECT name FROM sqlite_master WHERE type='index' ORDER BY name"
+        )
+        indexes = {row[0] for row in rows}
+
+        assert "idx_runs_agent" in indexes
+        assert "idx_runs_status" in indexes
+        assert "idx_runs_start" in indexes
+        assert "idx_runs_api_posted" in indexes
+        assert "idx_events_run" in indexes
+        assert "idx_commits_run" in indexes
+
+    def test_enables_delete_mode(self, db_paths):
+        """Should enable DELETE mode for Docker volume compatibility."""
+        path_str, _ = db_paths
+
+        schema.create_schema(path_str)
+
+        journal_mode = fetch_all(path_str, "PRAGMA journal_mode")[0][0]
+
+        assert journal_mode.lower() == "delete"
+
+    def test_records_schema_version(self, mem_db_uri):
+        """Should record schema version in migrations table."""
+        schema.create_schema(mem_db_uri)
+
+        rows = fetch_all(mem_db_uri, "SELECT version, description FROM schema_migrations")
+
+        assert rows
+        result = rows[0]
+        assert result[0] == schema.SCHEMA_VERSION
+        assert "Schema v6" in result[1]
+
+    def test_idempotent_execution(self, db_paths):
+        """Should be safe to run multiple times."""
+        path_str, _ = db_paths
+
+        # First run
+        success1, messages1 = schema.create_schema(path_str)
+        assert success1
+
+        # Second run
+        success2, messages2 = schema.create_schema(path_str)
+        assert success2
+
+        # Database should still be valid
+        tables = fetch_all(path_str, "SELECT name FROM sqlite_master WHERE type='table'")
+
+        assert len(tables) >= 4
+
+    def test_creates_parent_directories(self, tmp_path):
+        """Should create parent directories if they don't exist."""
+        db_path = tmp_path / "nested" / "path" / "test.db"
+
+        success, messages = schema.create_schema(db_path)
+
+        assert success
+        assert db_path.exists()
+        assert db_path.parent.exists()
+
+    def test_returns_informative_messages(self, db_paths):
+        """Should return informative messages about creation."""
+        path_str, _ = db_paths
+
+        success, messages = schema.create_schema(path_str)
+
+        assert success
+        assert len(messages) > 0
+        assert any("journal mode" in msg.lower() for msg in messages)
+        assert any("table" in msg.lower() for msg in messages)
+        assert any("index" in msg.lower() for msg in messages)
+
+
+class TestGetSchemaVersion:
+    """Test schema version retrieval."""
+
+    def test_returns_zero_for_nonexistent_database(self, class_tmp_dir):
+        """Should return 0 for database that doesn't exist."""
+        db_path = class_tmp_dir / "nonexistent.db"
+
+        version = schema.get_schema_version(db_path)
+
+        assert version == 0
+
+    def test_returns_correct_version(self, mem_db_uri, schema_template):
+        """Should return correct schema version from database."""
+        fast_create(mem_db_uri, schema_template)
+
+        version = schema.get_schema_version(mem_db_uri)
+
+        assert version == schema.SCHEMA_VERSION
+
+    def test_returns_zero_for_empty_database(self, class_tmp_dir):
+        """Should return 0 for database without migrations table."""
+        db_path = class_tmp_dir / "empty.db"
+
+        # Create empty database
+        conn = sqlite3.connect(db_path)
+        conn.close()
+
+        version = schema.get_schema_version(db_path)
+
+        assert version == 0
+
+
+@pytest.fixture(scope="class")
+def verified(tmp_path_factory, schema_template):
+    """Verify one valid schema database and share the result across the class."""
+    db_path = tmp_path_factory.mktemp("verify_schema") / "test.db"
+    fast_create(db_path, schema_template)
+    return schema.verify_schema(db_path)
+
+
+class TestVerifySchema:
+    """Test schema verification function."""
+
+    def test_fails_for_nonexistent_database(self, tmp_path):
+        """Should fail if database doesn't exist."""
+        db_path = tmp_path / "nonexistent.db"
+
+        success, messages = schema.verify_schema(db_path)
+
+        assert not success
+        assert any("does not exist" in msg for msg in messages)
+
+    def test_passes_for_valid_schema(self, verified):
+        """Should pass for correctly created schema."""
+        success, messages = verified
+
+        assert success
+        assert all("[OK]" in msg or "[ok]" in msg.lower() for msg in messages)
+
+    def test_checks_all_tables(self, verified):
+        """Should check for all required tables."""
+        success, messages = verified
+
+        assert success
+        assert _found(messages, {"agent_runs", "run_events", "commits", "schema_migrations"})
+
+    def test_checks_all_indexes(self, verified):
+        """Should check for all required indexes."""
+        success, messages = verified
+
+        assert success
+        assert _found(messages, {"idx_runs_agent", "idx_runs_status", "idx_runs_start"})
+
+    def test_checks_delete_mode(self, verified):
+        """Should check that DELETE mode is enabled."""
+        success, messages = verified
+
+        assert success
+        assert any("journal mode" in msg.lower() for msg in messages)
+
+    def test_checks_schema_version(self, verified):
+        """Should check schema version matches expected."""
+        success, messages = verified
+
+        assert success
+        assert any(f"version: {schema.SCHEMA_VERSION}" in msg.lower() for msg in messages)
+
+    def test_fails_for_missing_table(self, tmp_path):
+        """Should fail if a required table is missing."""
+        db_path = tmp_path / "incomplete.db"
+
+        # Create database with only some tables
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute(schema.TABLES["agent_runs"])
+        conn.commit()
+        conn.close()
+
+        success, messages = schema.verify_schema(db_path)
+
+        assert not success
+
+
+class TestSchemaConstraints:
+    """Test that schema constraints work correctly."""
+
+    def test_agent_runs_primary_key(self, mem_db_uri, schema_template):
+        """event_id should be unique in agent_runs."""
+        fast_create(mem_db_uri, schema_template)
+
+        conn = open_test_conn(mem_db_uri)
+        cursor = conn.cursor()
+
+        # Second row repeats event_id - the batch should abort on it
+        rows = [
+            ("event-1", "test_run_1", "test_agent", "test_job", "2025-12-10T00:00:00Z"),
+            ("event-1", "test_run_2", "test_agent", "test_job", "2025-12-10T00:00:00Z"),
+        ]
+        with pytest.raises(sqlite3.IntegrityError):
+            cursor.executemany(
+                "INSERT INTO agent_runs (event_id, run_id, agent_name, job_type, start_time) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+        # The first row was accepted before the duplicate was rejected
+        cursor.execute("SELECT run_id FROM agent_runs WHERE event_id = ?", ("event-1",))
+        assert cursor.fetchall() == [("test_run_1",)]
+
+        conn.close()
+
+    def test_trigger_type_constraint(self, mem_db_uri, schema_template):
+        """trigger_type accepts arbitrary values (no DB constraint)."""
+        fast_create(mem_db_uri, schema_template)
+
+        conn = open_test_conn(mem_db_uri)
+        cursor = conn.cursor()
+
+        # Valid trigger types should work (one transaction for the whole batch)
+        with conn:
+            cursor.executemany(
+                "INSERT INTO agent_runs (event_id, run_id, agent_name, job_type, start_time, trigger_type) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (f"event_{trigger_type}", f"run_{trigger_type}", "test_agent", "test_job", "2025-12-10T00:00:00Z", trigger_type)
+                    for trigger_type in ["cli", "web", "scheduler", "mcp", "manual"]
+                ],
+            )
+
+        # Invalid trigger type should still be accepted
+        cursor.execute(
+            "INSERT INTO agent_runs (event_id, run_id, agent_name, job_type, start_time, trigger_type) VALUES (?, ?, ?, ?, ?, ?)",
+            ("event_invalid", "run_invalid", "test_agent", "test_job", "2025-12-10T00:00:00Z", "invalid_type"),
+        )
+
+        conn.close()
+
+    def test_status_constraint(self, mem_db_uri, schema_template):
+        """status should only accept valid values."""
+        fast_create(mem_db_uri, schema_template)
+
+        conn = open_test_conn(mem_db_uri)
+        cursor = conn.cursor()
+
+        # Valid statuses should work (one transaction for the whole batch)
+        with conn:
+            cursor.executemany(
+                "INSERT INTO agent_runs (event_id, run_id, agent_name, job_type, start_time, status) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (f"event_{status}", f"run_{status}", "test_agent", "test_job", "2025-12-10T00:00:00Z", status)
+                    for status in ["running", "success", "failure", "partial", "timeout", "cancelled"]
+                ],
+            )
+
+        # Invalid status should fail
+        with pytest.raises(sqlite3.IntegrityError):
+            cursor.execute(
+                "INSERT INTO agent_runs (event_id, run_id, agent_name, job_type, start_time, status) VALUES (?, ?, ?, ?, ?, ?)",
+                ("event_invalid_status", "run_invalid", "test_agent", "test_job", "2025-12-10T00:00:00Z", "invalid_status"),
+            )
+
+        conn.close()
+
+
+@pytest.mark.integration
+class TestIntegration:
+    """Integration tests for full workflow."""
+
+    def test_create_verify_export_workflow(self, tmp_path):
+        """Test complete workflow: create, verify, export."""
+        db_path = tmp_path / "telemetry.db"
+        sql_path = tmp_path / "schema.sql"
+
+        # Create schema
+        success, messages = schema.create_schema(db_path)
+        assert success
+
+        # Verify schema
+        success, messages = schema.verify_schema(db_path)
+        assert success
+
+        # Export schema
+        success, message = schema.export_schema_sql(sql_path)
+        assert success
+
+        # All files should exist
+        assert db_path.exists()
+        assert sql_path.exists()
+
+    def test_schema_supports_basic_operations(self, tmp_path, schema_template):
+        """Test that schema supports basic insert/select operations."""
+        db_path = tmp_path / "test.db"
+        fast_create(db_path, schema_template)
+
+        # Autocommit mode: transaction boundaries are explicit, no implicit BEGIN sniffing
+        conn = open_test_conn(db_path, isolation_level=None)
+        cursor = conn.cursor()
+
+        # All three inserts commit in a single transaction
+        cursor.execute("BEGIN")
+
+        # Insert into agent_runs
+        cursor.execute(
+            """
+            INSERT INTO agent_runs (event_id, run_id, agent_name, job_type, start_time, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            ("event_1", "test_run_1", "test_agent", "test_job", "2025-12-10T00:00:00Z", "success"),
+        )
+
+        # Insert into run_events
+        cursor.execute(
+            """
+            INSERT INTO run_events (run_id, event_type, timestamp)
+            VALUES (?, ?, ?)
+            """,
+            ("test_run_1", "checkpoint", "2025-12-10T00:01:00Z"),
+        )
+
+        # Insert into commits
+        cursor.execute(
+            """
+            INSERT INTO commits (commit_hash, run_id, agent_name)
+            VALUES (?, ?, ?)
+            """,
+            ("abc123", "test_run_1", "test_agent"),
+        )
+
+        cursor.execute("COMMIT")
+
+        # Query data
+        cursor.execute("SELECT COUNT(*) FROM agent_runs")
+        assert cursor.fetchone()[0] == 1
+
+        cursor.execute("SELECT COUNT(*) FROM run_events")
+        assert cursor.fetchone()[0] == 1
+
+        cursor.execute("SELECT COUNT(*) FROM commits")
+        assert cursor.fetchone()[0] == 1
+
+        conn.close()
+
+
+# Run tests if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,153 @@
+"""
+Tests for database schema module - definitions and SQL export.
+
+Covers the schema constants and export_schema_sql(). These tests do not
+create schema databases themselves, so the whole module is marked fast.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add src to path for importing telemetry package
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from telemetry import schema
+
+pytestmark = pytest.mark.fast
+
+# Schema constants are immutable for the session; snapshot them once
+_TABLE_NAMES = frozenset(schema.TABLES)
+_TABLE_SQLS = tuple(schema.TABLES.values())
+_INDEX_SQLS = tuple(schema.INDEXES)
+
+
+def _all_have(substr, items):
+    """True if every SQL string in items contains substr."""
+    return all(substr in item for item in items)
+
+
+class TestSchemaConstants:
+    """Test schema constant definitions."""
+
+    def test_schema_version_defined(self):
+        """Schema version should be defined as an integer."""
+        assert isinstance(schema.SCHEMA_VERSION, int)
+        assert schema.SCHEMA_VERSION >= 1
+
+    def test_tables_defined(self):
+        """All required tables should be defined."""
+        assert {"agent_runs", "run_events", "commits", "schema_migrations"} <= _TABLE_NAMES
+
+    def test_table_definitions_are_strings(self):
+        """Table definitions should be SQL strings."""
+        assert all(isinstance(table_sql, str) and table_sql for table_sql in _TABLE_SQLS)
+        assert _all_have("CREATE TABLE", _TABLE_SQLS)
+
+    def test_indexes_defined(self):
+        """Indexes should be defined as a list."""
+        assert isinstance(schema.INDEXES, list)
+        assert len(schema.INDEXES) >= 6
+
+    def test_index_definitions_are_strings(self):
+        """Index definitions should be SQL strings."""
+        assert all(isinstance(index_sql, str) for index_sql in _INDEX_SQLS)
+        assert _all_have("CREATE INDEX", _INDEX_SQLS)
+
+
+@pytest.fixture(scope="class")
+def exported(tmp_path_factory):
+    """Export the schema once and share the path, result and decoded content."""
+    output_path = tmp_path_factory.mktemp("export_schema") / "schema.sql"
+    success, message = schema.export_schema_sql(output_path)
+    return SimpleNamespace(
+        path=output_path,
+        success=success,
+        message=message,
+        content=output_path.read_text(encoding="utf-8"),
+    )
+
+
+@pytest.fixture(scope="session")
+def reference_dump(schema_template):
+    """CREATE TABLE statements of the reference schema built by create_schema()."""
+    return frozenset(
+        line for line in schema_template.iterdump() if line.startswith("CREATE TABLE")
+    )
+
+
+class TestExportSchemaSql:
+    """Test schema SQL export function."""
+
+    def test_creates_sql_file(self, class_tmp_dir):
+        """Should create SQL file at specified path."""
+        output_path = class_tmp_dir / "created.sql"
+
+        success, message = schema.export_schema_sql(output_path)
+
+        assert success
+        assert output_path.exists()
+
+    def test_sql_file_contains_tables(self, exported):
+        """SQL file should contain all table definitions."""
+        content = exported.content
+
+        assert "CREATE TABLE" in content
+        assert "agent_runs" in content
+        assert "run_events" in content
+        assert "commits" in content
+        assert "schema_migrations" in content
+
+    def test_sql_file_contains_indexes(self, exported):
+        """SQL file should contain all index definitions."""
+        content = exported.content
+
+        assert "CREATE INDEX" in content
+        assert "idx_runs_agent" in content
+        assert "idx_runs_status" in content
+
+    def test_sql_file_contains_version(self, exported):
+        """SQL file should contain schema version."""
+        content = exported.content
+
+        assert f"Version: {schema.SCHEMA_VERSION}" in content
+
+    def test_sql_file_contains_delete_pragma(self, exported):
+        """SQL file should enable DELETE mode."""
+        content = exported.content
+
+        assert "PRAGMA journal_mode=DELETE" in content
+        assert "PRAGMA synchronous=FULL" in content
+
+    def test_creates_parent_directories(self, class_tmp_dir):
+        """Should create parent directories if needed."""
+        output_path = class_tmp_dir / "nested" / "path" / "schema.sql"
+
+        success, message = schema.export_schema_sql(output_path)
+
+        assert success
+        assert output_path.exists()
+
+    def test_sql_file_is_valid(self, exported, reference_dump):
+        """Exported SQL should be valid, executable, and match the created schema."""
+        # Execute exported SQL into a scratch database
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(exported.content)
+        dump = frozenset(
+            line for line in conn.iterdump() if line.startswith("CREATE TABLE")
+        )
+        conn.close()
+
+        # Tables must be identical to the ones create_schema() produces
+        assert dump == reference_dump
+        assert any("CREATE TABLE agent_runs" in line for line in dump)
+        assert any("CREATE TABLE run_events" in line for line in dump)
+        assert any("CREATE TABLE commits" in line for line in dump)
+
+
+# Run tests if executed directly
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -17,15 +17,56 @@ import sqlite3
 import tempfile
 import threading
 import time
+from contextlib import closing
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 import pytest
-from telemetry.database import DatabaseWriter
+from telemetry.database import _PENDING_API_POSTS_SQL, DatabaseWriter
 from telemetry.models import RunRecord, get_iso8601_timestamp
-from telemetry.schema import create_schema
+from tests._dbutil import fast_create, fetch_all, open_test_conn, shared_memory_db
+
+
+@pytest.fixture(scope="module")
+def shared_db(request, v7_schema_template):
+    """
+    One in-memory schema database and writer shared by every test in this module.
+
+    A keeper connection holds the shared-cache database open for the whole
+    module, independent of the writer's own connection. Tests that check
+    on-disk behavior use their own tmp_path file instead.
+    """
+    with shared_memory_db(request.module.__name__, v7_schema_template) as db_uri:
+        writer = DatabaseWriter(db_uri)
+        yield writer, db_uri
+        writer.close()
+
+
+@pytest.fixture
+def writer(shared_db):
+    """The module's shared DatabaseWriter, emptied before each test."""
+    return shared_db[0]
+
+
+@pytest.fixture
+def db_file(tmp_path, v7_schema_template):
+    """A private on-disk schema database, for tests that need a real file."""
+    db_path = tmp_path / "test.sqlite"
+    fast_create(db_path, v7_schema_template)
+    return db_path
+
+
+@pytest.fixture(autouse=True)
+def clean_runs(shared_db):
+    """Empty the shared database before each test."""
+    _, db_path = shared_db
+    with closing(open_test_conn(db_path)) as conn:
+        with conn:
+            conn.execute("DELETE FROM agent_runs")
+            conn.execute("DELETE FROM run_events")
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = 'run_events'")
 
 
 class TestDatabaseWriterCreation:
@@ -46,6 +87,13 @@ class TestDatabaseWriterCreation:
 
         assert writer.max_retries == 5
 
+    def test_writer_keeps_uri_as_string(self):
+        """Test that a file: URI is not converted to a Path."""
+        db_uri = "file:writer_uri_test?mode=memory&cache=shared"
+        writer = DatabaseWriter(db_uri)
+
+        assert writer.database_path == db_uri
+
 
 class TestDatabaseConnection:
     """Test database connection management."""
@@ -55,18 +103,13 @@ class TestDatabaseConnection:
         db_path = tmp_path / "test.sqlite"
         writer = DatabaseWriter(db_path)
 
-        conn = writer._get_connection()
+        writer._get_connection()
         assert db_path.exists()
-        conn.close()
+        writer.close()
 
-    def test_get_connection_enables_delete_mode(self, tmp_path):
+    def test_get_connection_enables_delete_mode(self, db_file):
         """Test that get_connection enables DELETE mode."""
-        db_path = tmp_path / "test.sqlite"
-
-        # Create schema first
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
+        writer = DatabaseWriter(db_file)
         conn = writer._get_connection()
 
         # Check DELETE mode
@@ -74,22 +117,74 @@ class TestDatabaseConnection:
         cursor.execute("PRAGMA journal_mode")
         mode = cursor.fetchone()[0]
 
-        conn.close()
+        writer.close()
         assert mode.upper() == "DELETE"
 
+    def test_get_connection_sets_page_cache(self, writer):
+        """Test that connections get a 16 MiB page cache."""
+        conn = writer._get_connection()
 
-class TestInsertRun:
-    """Test inserting run records."""
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16384
 
-    def test_insert_run_success(self, tmp_path):
-        """Test successful run insertion."""
-        db_path = tmp_path / "test.sqlite"
+    def test_writes_begin_immediate(self, writer):
+        """Test that write statements take the write lock up front."""
+        conn = writer._get_connection()
 
-        # Setup database with schema
-        create_schema(str(db_path))
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            writer.mark_api_posted("test-run-123", get_iso8601_timestamp())
+            writer._execute_with_retry("SELECT 1", (), fetch=True)
+        finally:
+            conn.set_trace_callback(None)
+
+        assert statements.count("BEGIN IMMEDIATE") == 1
 
+    def test_get_connection_reuses_connection(self, tmp_path):
+        """Test that a writer keeps one connection per thread until close()."""
+        db_path = tmp_path / "test.sqlite"
         writer = DatabaseWriter(db_path)
 
+        conn = writer._get_connection()
+        assert writer._get_connection() is conn
+
+        writer.close()
+        reopened = writer._get_connection()
+        assert reopened is not conn
+        writer.close()
+
+    def test_get_connection_reopens_after_fork(self, tmp_path, monkeypatch):
+        """Test that a connection inherited across fork() is replaced, never reused or closed."""
+        writer = DatabaseWriter(tmp_path / "test.sqlite")
+        inherited = writer._get_connection()
+
+        # Simulate running in a forked child
+        monkeypatch.setattr("telemetry.database.os.getpid", lambda: -1)
+        assert writer._get_connection() is not inherited
+        writer.close()
+
+        writer._local.conn, writer._local.pid = inherited, 0
+        writer.close()
+        assert writer._local.conn is None
+
+        inherited.execute("SELECT 1")  # Still open for the parent
+        inherited.close()
+
+    def test_writer_context_manager_closes_connection(self, tmp_path):
+        """Test leaving a with-block closes the thread's cached connection."""
+        with DatabaseWriter(tmp_path / "test.sqlite") as writer:
+            conn = writer._get_connection()
+
+        assert writer._local.conn is None
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+class TestInsertRun:
+    """Test inserting run records."""
+
+    def test_insert_run_success(self, writer):
+        """Test successful run insertion."""
         record = RunRecord(
             run_id="test-run-123",
             agent_name="test_agent",
@@ -109,14 +204,8 @@ class TestInsertRun:
         assert success is True, f"Insert failed: {message}"
         assert "[OK]" in message
 
-    def test_insert_run_with_all_fields(self, tmp_path):
+    def test_insert_run_with_all_fields(self, writer):
         """Test inserting run with all fields populated."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         record = RunRecord(
             run_id="test-run-123",
             agent_name="test_agent",
@@ -150,14 +239,8 @@ class TestInsertRun:
         assert retrieved is not None
         assert retrieved.items_discovered == 10
 
-    def test_insert_run_duplicate_id(self, tmp_path):
+    def test_insert_run_duplicate_id(self, writer):
         """Test inserting run with duplicate ID fails."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         record = RunRecord(
             run_id="test-run-123",
             agent_name="test_agent",
@@ -176,18 +259,63 @@ class TestInsertRun:
         assert success2 is False
         assert "FAIL" in message2 or "error" in message2.lower()
 
+    def test_insert_runs_bulk(self, shared_db):
+        """Test inserting many runs in one transaction."""
+        writer, db_uri = shared_db
+        records = [
+            RunRecord(
+                run_id=f"bulk-run-{i}",
+                agent_name="test_agent",
+                job_type="test_job",
+                trigger_type="cli",
+                start_time=get_iso8601_timestamp(),
+                status="success",
+            )
+            for i in range(10)
+        ]
+
+        success, message = writer.insert_runs_bulk(records)
 
-class TestUpdateRun:
-    """Test updating run records."""
+        assert success is True, message
+        assert fetch_all(db_uri, "SELECT COUNT(*) FROM agent_runs") == [(10,)]
 
-    def test_update_run_success(self, tmp_path):
-        """Test successful run update."""
-        db_path = tmp_path / "test.sqlite"
+    def test_insert_runs_bulk_is_atomic(self, shared_db):
+        """Test a failing row rolls back the whole batch."""
+        writer, db_uri = shared_db
+        record = RunRecord(
+            run_id="bulk-run-dup",
+            agent_name="test_agent",
+            job_type="test_job",
+            trigger_type="cli",
+            start_time=get_iso8601_timestamp(),
+            status="success",
+        )
+        other = RunRecord(
+            run_id="bulk-run-other",
+            agent_name="test_agent",
+            job_type="test_job",
+            trigger_type="cli",
+            start_time=get_iso8601_timestamp(),
+            status="success",
+        )
 
-        create_schema(str(db_path))
+        # Same record twice violates the event_id UNIQUE constraint
+        success, _ = writer.insert_runs_bulk([other, record, record])
+
+        assert success is False
+        assert fetch_all(db_uri, "SELECT COUNT(*) FROM agent_runs") == [(0,)]
+
+    def test_insert_runs_bulk_empty(self, writer):
+        """Test an empty batch is a successful no-op."""
+        success, _ = writer.insert_runs_bulk([])
+        assert success is True
 
-        writer = DatabaseWriter(db_path)
 
+class TestUpdateRun:
+    """Test updating run records."""
+
+    def test_update_run_success(self, writer):
+        """Test successful run update."""
         # Insert initial record
         record = RunRecord(
             run_id="test-run-123",
@@ -215,14 +343,8 @@ class TestUpdateRun:
         assert retrieved.status == "success"
         assert retrieved.items_succeeded == 5
 
-    def test_update_run_nonexistent(self, tmp_path):
+    def test_update_run_nonexistent(self, writer):
         """Test updating non-existent run."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         record = RunRecord(
             run_id="nonexistent-run",
             agent_name="test_agent",
@@ -240,14 +362,8 @@ class TestUpdateRun:
 class TestGetRun:
     """Test retrieving run records."""
 
-    def test_get_run_found(self, tmp_path):
+    def test_get_run_found(self, writer):
         """Test retrieving existing run."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert record
         record = RunRecord(
             run_id="test-run-123",
@@ -267,14 +383,63 @@ class TestGetRun:
         assert retrieved.run_id == "test-run-123"
         assert retrieved.agent_name == "test_agent"
 
-    def test_get_run_not_found(self, tmp_path):
-        """Test retrieving non-existent run."""
-        db_path = tmp_path / "test.sqlite"
+    def test_get_run_round_trip(self, writer):
+        """Test every RunRecord field survives insert_run -> get_run and the pending query."""
+        record = RunRecord(
+            run_id="round-trip-run",
+            agent_name="test_agent",
+            agent_owner="owner",
+            job_type="test_job",
+            trigger_type="cli",
+            start_time="2025-12-15T12:00:00+00:00",
+            end_time="2025-12-15T12:05:00+00:00",
+            status="success",
+            product="product",
+            product_family="family",
+            platform="linux",
+            subdomain="docs",
+            website="example.com",
+            website_section="blog",
+            item_name="item",
+            items_discovered=10,
+            items_succeeded=7,
+            items_failed=2,
+            items_skipped=1,
+            duration_ms=300000,
+            input_summary="input",
+            output_summary="output",
+            source_ref="src",
+            target_ref="dst",
+            error_summary="error",
+            error_details="details",
+            metrics_json='{"custom": "metrics"}',
+            context_json='{"ctx": 1}',
+            insight_id="insight-1",
+            parent_run_id="parent-run",
+            git_repo="test/repo",
+            git_branch="main",
+            git_run_tag="test/repo/main",
+            git_commit_hash="abc1234",
+            git_commit_source="manual",
+            git_commit_author="Dev <dev@example.com>",
+            git_commit_timestamp="2025-12-15T12:06:00+00:00",
+            host="test-host",
+            environment="ci",
+            created_at="2025-12-15T12:00:00+00:00",
+            updated_at="2025-12-15T12:05:00+00:00",
+        )
+        success, message = writer.insert_run(record)
+        assert success is True, message
 
-        create_schema(str(db_path))
+        retrieved = writer.get_run("round-trip-run")
+        pending = writer.get_pending_api_posts()
 
-        writer = DatabaseWriter(db_path)
+        assert isinstance(retrieved, RunRecord)
+        assert retrieved.to_dict() == record.to_dict()
+        assert [run.to_dict() for run in pending] == [record.to_dict()]
 
+    def test_get_run_not_found(self, writer):
+        """Test retrieving non-existent run."""
         retrieved = writer.get_run("nonexistent-run")
         assert retrieved is None
 
@@ -282,14 +447,8 @@ class TestGetRun:
 class TestAPIPosting:
     """Test API posting status tracking."""
 
-    def test_mark_api_posted(self, tmp_path):
+    def test_mark_api_posted(self, writer):
         """Test marking run as posted to API."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert record
         record = RunRecord(
             run_id="test-run-123",
@@ -313,14 +472,8 @@ class TestAPIPosting:
         assert retrieved.api_posted is True
         assert retrieved.api_posted_at == posted_at
 
-    def test_increment_api_retry_count(self, tmp_path):
+    def test_increment_api_retry_count(self, writer):
         """Test incrementing API retry count."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert record
         record = RunRecord(
             run_id="test-run-123",
@@ -333,26 +486,21 @@ class TestAPIPosting:
 
         writer.insert_run(record)
 
-        # Increment retry count multiple times
-        for _ in range(3):
-            success, _ = writer.increment_api_retry_count("test-run-123")
-            assert success is True
+        # Increment once, then record several attempts in one call
+        success, _ = writer.increment_api_retry_count("test-run-123")
+        assert success is True
+        success, _ = writer.increment_api_retry_count("test-run-123", by=2)
+        assert success is True
 
         # Verify
         retrieved = writer.get_run("test-run-123")
         assert retrieved.api_retry_count == 3
 
-    def test_get_pending_api_posts(self, tmp_path):
+    def test_get_pending_api_posts(self, writer):
         """Test retrieving runs pending API posting."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert multiple records
-        for i in range(5):
-            record = RunRecord(
+        records = [
+            RunRecord(
                 run_id=f"test-run-{i}",
                 agent_name="test_agent",
                 job_type="test_job",
@@ -360,7 +508,10 @@ class TestAPIPosting:
                 start_time=get_iso8601_timestamp(),
                 status="success",
             )
-            writer.insert_run(record)
+            for i in range(5)
+        ]
+        success, message = writer.insert_runs_bulk(records)
+        assert success is True, message
 
         # Mark some as posted
         writer.mark_api_posted("test-run-0", get_iso8601_timestamp())
@@ -376,17 +527,11 @@ class TestAPIPosting:
         assert "test-run-3" in pending_ids
         assert "test-run-4" in pending_ids
 
-    def test_get_pending_api_posts_limit(self, tmp_path):
+    def test_get_pending_api_posts_limit(self, writer):
         """Test get_pending_api_posts respects limit."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert many records
-        for i in range(20):
-            record = RunRecord(
+        records = [
+            RunRecord(
                 run_id=f"test-run-{i}",
                 agent_name="test_agent",
                 job_type="test_job",
@@ -394,40 +539,42 @@ class TestAPIPosting:
                 start_time=get_iso8601_timestamp(),
                 status="success",
             )
-            writer.insert_run(record)
+            for i in range(20)
+        ]
+        success, message = writer.insert_runs_bulk(records)
+        assert success is True, message
 
         # Get with limit
         pending = writer.get_pending_api_posts(limit=5)
         assert len(pending) == 5
 
+    def test_get_pending_api_posts_uses_partial_index(self, shared_db):
+        """Test the pending query is served by idx_runs_pending_api without a sort."""
+        _, db_uri = shared_db
+
+        plan = fetch_all(db_uri, "EXPLAIN QUERY PLAN " + _PENDING_API_POSTS_SQL, (5,))
+        details = [row[3] for row in plan]
+
+        assert any("idx_runs_pending_api" in detail for detail in details)
+        assert not any("TEMP B-TREE" in detail for detail in details)
+
 
 class TestRunStatistics:
     """Test getting run statistics."""
 
-    def test_get_run_stats_empty(self, tmp_path):
+    def test_get_run_stats_empty(self, writer):
         """Test statistics for empty database."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
         stats = writer.get_run_stats()
 
         assert stats["total_runs"] == 0
         assert stats["pending_api_posts"] == 0
 
-    def test_get_run_stats_with_runs(self, tmp_path):
+    def test_get_run_stats_with_runs(self, writer):
         """Test statistics with multiple runs."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert runs with different statuses
         statuses = ["success", "success", "failure", "partial", "success"]
-        for i, status in enumerate(statuses):
-            record = RunRecord(
+        records = [
+            RunRecord(
                 run_id=f"test-run-{i}",
                 agent_name="test_agent",
                 job_type="test_job",
@@ -435,7 +582,10 @@ class TestRunStatistics:
                 start_time=get_iso8601_timestamp(),
                 status=status,
             )
-            writer.insert_run(record)
+            for i, status in enumerate(statuses)
+        ]
+        success, message = writer.insert_runs_bulk(records)
+        assert success is True, message
 
         stats = writer.get_run_stats()
 
@@ -444,18 +594,45 @@ class TestRunStatistics:
         assert stats["status_counts"]["failure"] == 1
         assert stats["status_counts"]["partial"] == 1
 
+    def test_get_run_stats_pending_api_posts(self, writer):
+        """Test pending_api_posts counts unposted, finished runs only."""
+        statuses = ["running", "running", "success", "success", "failure", "partial"]
+        records = [
+            RunRecord(
+                run_id=f"test-run-{i}",
+                agent_name="test_agent",
+                job_type="test_job",
+                trigger_type="cli",
+                start_time=get_iso8601_timestamp(),
+                status=status,
+            )
+            for i, status in enumerate(statuses)
+        ]
+        success, message = writer.insert_runs_bulk(records)
+        assert success is True, message
 
-class TestRetryLogic:
-    """Test retry logic for lock contention."""
+        # Posted: one running run (not pending anyway) and one success run
+        writer.mark_api_posted("test-run-0", get_iso8601_timestamp())
+        writer.mark_api_posted("test-run-2", get_iso8601_timestamp())
 
-    def test_execute_with_retry_success_first_attempt(self, tmp_path):
-        """Test operation succeeds on first attempt."""
-        db_path = tmp_path / "test.sqlite"
+        stats = writer.get_run_stats()
 
-        create_schema(str(db_path))
+        assert stats["total_runs"] == 6
+        assert stats["status_counts"] == {
+            "running": 2,
+            "success": 2,
+            "failure": 1,
+            "partial": 1,
+        }
+        # Unposted and not running: test-run-3, test-run-4, test-run-5
+        assert stats["pending_api_posts"] == 3
 
-        writer = DatabaseWriter(db_path)
 
+class TestRetryLogic:
+    """Test retry logic for lock contention."""
+
+    def test_execute_with_retry_success_first_attempt(self, writer):
+        """Test operation succeeds on first attempt."""
         # Should succeed immediately
         sql = "SELECT 1"
         success, result, message = writer._execute_with_retry(sql, (), fetch=True)
@@ -463,28 +640,62 @@ class TestRetryLogic:
         assert success is True
         assert result == (1,)
 
+    def test_retry_backoff_is_jittered_and_capped(self, tmp_path):
+        """Test lock-retry sleeps stay within the doubling window and the cap."""
+        writer = DatabaseWriter(tmp_path / "test.sqlite", retry_delay=0.005)
+
+        for attempt in range(10):
+            delay = writer._retry_backoff(attempt)
+            assert 0 <= delay <= min(0.005, 0.001 * 2**attempt)
+
+    def test_lock_retry_sleeps_within_bounds(self, tmp_path, monkeypatch):
+        """Test each lock-retry sleep is bounded by its window and retry_delay."""
+        writer = DatabaseWriter(tmp_path / "test.sqlite", max_retries=6, retry_delay=0.01)
+
+        def locked_connection():
+            raise sqlite3.OperationalError("database is locked")
+
+        sleeps = []
+        monkeypatch.setattr(writer, "_get_connection", locked_connection)
+        monkeypatch.setattr("telemetry.database.time.sleep", sleeps.append)
+
+        success, _, message = writer._execute_with_retry("SELECT 1", ())
+
+        assert success is False
+        assert "locked after 6 retries" in message
+        # No sleep after the final attempt
+        assert len(sleeps) == 5
+        for attempt, delay in enumerate(sleeps):
+            assert 0 <= delay <= min(0.01, 0.001 * 2**attempt)
+
     @pytest.mark.serial
     @pytest.mark.slow
     @pytest.mark.requires_db
-    def test_execute_with_retry_handles_lock_error(self, tmp_path):
+    def test_execute_with_retry_handles_lock_error(self, db_file):
         """Test retry logic handles REAL database lock errors."""
-        db_path = tmp_path / "test.sqlite"
-
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path, max_retries=5, retry_delay=0.1)
+        writer = DatabaseWriter(db_file, max_retries=5, retry_delay=0.1)
 
         # Create a REAL database lock by holding a transaction in a background thread
-        lock_released = threading.Event()
         lock_acquired = threading.Event()
+        foreground_attempted = threading.Event()
+
+        # Signal as soon as the writer starts opening its connection, so the
+        # background thread can release the lock instead of sleeping a fixed time
+        open_connection = writer._get_connection
+
+        def signalling_get_connection():
+            foreground_attempted.set()
+            return open_connection()
+
+        writer._get_connection = signalling_get_connection
 
         def create_lock():
-            # Hold an exclusive write lock temporarily
-            conn = sqlite3.connect(str(db_path), timeout=0.05)
+            # Hold an exclusive write lock until the writer starts its attempt
+            conn = sqlite3.connect(str(db_file), timeout=0.05)
             try:
                 conn.execute("BEGIN EXCLUSIVE")
                 lock_acquired.set()  # Signal that lock is held
-                lock_released.wait(timeout=0.5)  # Wait for test to signal release or timeout
+                foreground_attempted.wait(timeout=2.0)
                 conn.rollback()
             finally:
                 conn.close()
@@ -506,7 +717,7 @@ class TestRetryLogic:
             assert result == (1,)
 
         finally:
-            lock_released.set()  # Signal background thread to release lock
+            foreground_attempted.set()  # Release the lock even if the writer never ran
             lock_thread.join(timeout=2.0)
 
 
@@ -10,18 +10,32 @@ Tests cover:
 - TelemetryClient.associate_commit() method
 """
 
-import sys
+import inspect
 import sqlite3
 import tempfile
+from contextlib import closing
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
 import pytest
+
 from telemetry.database import DatabaseWriter
-from telemetry.models import RunRecord, APIPayload, get_iso8601_timestamp
-from telemetry.schema import create_schema, verify_schema, SCHEMA_VERSION
+from telemetry.models import APIPayload, RunRecord, get_iso8601_timestamp
+from telemetry.schema import SCHEMA_VERSION, create_schema, verify_schema
+from tests._dbutil import fast_create, shared_memory_db
+
+try:  # scripts/ is on sys.path via conftest
+    from migrate_v3_to_v4 import migrate_v3_to_v4
+except ImportError:  # Reported by TestMigrationV3ToV4 rather than at collection
+    migrate_v3_to_v4 = None
+
+
+@pytest.fixture
+def writer(request, v7_schema_template):
+    """DatabaseWriter on a private in-memory copy of the schema (no fsyncs)."""
+    with shared_memory_db(request.node.nodeid, v7_schema_template) as db_uri:
+        writer = DatabaseWriter(db_uri)
+        yield writer
+        writer.close()
 
 
 class TestSchemaV6Fields:
@@ -39,11 +53,8 @@ class TestSchemaV6Fields:
         assert success is True
 
         # Check columns exist
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(agent_runs)")
-        columns = {row[1] for row in cursor.fetchall()}
-        conn.close()
+        with closing(sqlite3.connect(str(db_path))) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(agent_runs)")}
 
         assert "git_commit_hash" in columns
         assert "git_commit_source" in columns
@@ -68,10 +79,10 @@ class TestSchemaV6Fields:
 
         assert result is not None, "idx_runs_commit index should exist"
 
-    def test_verify_schema_includes_commit_index(self, tmp_path):
+    def test_verify_schema_includes_commit_index(self, tmp_path, schema_template):
         """Test that verify_schema checks for idx_runs_commit."""
         db_path = tmp_path / "test.sqlite"
-        create_schema(str(db_path))
+        fast_create(db_path, schema_template)
 
         success, messages = verify_schema(str(db_path))
 
@@ -79,85 +90,76 @@ class TestSchemaV6Fields:
         assert any("idx_runs_commit" in msg for msg in messages)
 
 
+_BASE_RUN = {
+    "run_id": "test-123",
+    "agent_name": "test",
+    "job_type": "test",
+    "trigger_type": "cli",
+    "start_time": "2025-12-15T12:00:00+00:00",
+    "status": "success",
+}
+
+# Git commit fields as RunRecord defaults them
+_GIT_COMMIT_UNSET = {
+    "git_commit_hash": None,
+    "git_commit_source": None,
+    "git_commit_author": None,
+    "git_commit_timestamp": None,
+}
+
+GIT_COMMIT_CASES = [
+    pytest.param({}, id="unset"),
+    pytest.param(
+        {
+            "git_commit_hash": "abc1234567890abcdef",
+            "git_commit_source": "llm",
+            "git_commit_author": "Claude <claude@anthropic.com>",
+            "git_commit_timestamp": "2025-12-15T12:00:00+00:00",
+        },
+        id="llm",
+    ),
+    pytest.param(
+        {"git_commit_hash": "abc123", "git_commit_source": "manual"},
+        id="manual-partial",
+    ),
+    pytest.param(
+        {
+            "git_commit_hash": "abc123",
+            "git_commit_source": "ci",
+            "git_commit_author": "CI Bot",
+            "git_commit_timestamp": "2025-12-15T13:00:00+00:00",
+        },
+        id="ci",
+    ),
+]
+
+
 class TestRunRecordGitCommitFields:
     """Test RunRecord dataclass with git commit fields."""
 
-    def test_run_record_has_git_commit_fields(self):
-        """Test RunRecord has git commit field attributes."""
-        record = RunRecord(
-            run_id="test-123",
-            agent_name="test",
-            job_type="test",
-            trigger_type="cli",
-            start_time=get_iso8601_timestamp(),
-            status="running",
-        )
+    @pytest.mark.parametrize("git_fields", GIT_COMMIT_CASES)
+    def test_run_record_accepts_git_commit_fields(self, git_fields):
+        """Test RunRecord() stores git commit values and defaults the rest to None."""
+        record = RunRecord(**_BASE_RUN, **git_fields)
 
-        assert hasattr(record, "git_commit_hash")
-        assert hasattr(record, "git_commit_source")
-        assert hasattr(record, "git_commit_author")
-        assert hasattr(record, "git_commit_timestamp")
+        actual = {name: getattr(record, name) for name in _GIT_COMMIT_UNSET}
+        assert actual == {**_GIT_COMMIT_UNSET, **git_fields}
 
-    def test_run_record_with_git_commit_values(self):
-        """Test RunRecord accepts git commit values."""
-        record = RunRecord(
-            run_id="test-123",
-            agent_name="test",
-            job_type="test",
-            trigger_type="cli",
-            start_time=get_iso8601_timestamp(),
-            status="success",
-            git_commit_hash="abc1234567890abcdef",
-            git_commit_source="llm",
-            git_commit_author="Claude <claude@anthropic.com>",
-            git_commit_timestamp="2025-12-15T12:00:00+00:00",
-        )
-
-        assert record.git_commit_hash == "abc1234567890abcdef"
-        assert record.git_commit_source == "llm"
-        assert record.git_commit_author == "Claude <claude@anthropic.com>"
-        assert record.git_commit_timestamp == "2025-12-15T12:00:00+00:00"
-
-    def test_run_record_to_dict_includes_git_commit(self):
+    @pytest.mark.parametrize("git_fields", GIT_COMMIT_CASES)
+    def test_run_record_to_dict_includes_git_commit(self, git_fields):
         """Test RunRecord.to_dict() includes git commit fields."""
-        record = RunRecord(
-            run_id="test-123",
-            agent_name="test",
-            job_type="test",
-            trigger_type="cli",
-            start_time=get_iso8601_timestamp(),
-            status="success",
-            git_commit_hash="abc123",
-            git_commit_source="manual",
-        )
-
-        data = record.to_dict()
+        data = RunRecord(**_BASE_RUN, **git_fields).to_dict()
 
-        assert "git_commit_hash" in data
-        assert "git_commit_source" in data
-        assert data["git_commit_hash"] == "abc123"
-        assert data["git_commit_source"] == "manual"
+        actual = {name: data[name] for name in _GIT_COMMIT_UNSET}
+        assert actual == {**_GIT_COMMIT_UNSET, **git_fields}
 
-    def test_run_record_from_dict_with_git_commit(self):
+    @pytest.mark.parametrize("git_fields", GIT_COMMIT_CASES)
+    def test_run_record_from_dict_with_git_commit(self, git_fields):
         """Test RunRecord.from_dict() handles git commit fields."""
-        data = {
-            "run_id": "test-123",
-            "agent_name": "test",
-            "job_type": "test",
-            "trigger_type": "cli",
-            "start_time": "2025-12-15T12:00:00+00:00",
-            "status": "success",
-            "git_commit_hash": "abc123",
-            "git_commit_source": "ci",
-            "git_commit_author": "CI Bot",
-            "git_commit_timestamp": "2025-12-15T13:00:00+00:00",
-        }
-
-        record = RunRecord.from_dict(data)
+        record = RunRecord.from_dict({**_BASE_RUN, **git_fields})
 
-        assert record.git_commit_hash == "abc123"
-        assert record.git_commit_source == "ci"
-        assert record.git_commit_author == "CI Bot"
+        actual = {name: getattr(record, name) for name in _GIT_COMMIT_UNSET}
+        assert actual == {**_GIT_COMMIT_UNSET, **git_fields}
 
 
 class TestAPIPayloadGitCommitFields:
@@ -202,13 +204,8 @@ class TestAPIPayloadGitCommitFields:
 class TestDatabaseWriterAssociateCommit:
     """Test DatabaseWriter.associate_commit() method."""
 
-    def test_associate_commit_success(self, tmp_path):
+    def test_associate_commit_success(self, writer):
         """Test successful commit association."""
-        db_path = tmp_path / "test.sqlite"
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert a run
         record = RunRecord(
             run_id="test-run-123",
@@ -239,13 +236,8 @@ class TestDatabaseWriterAssociateCommit:
         assert updated.git_commit_author == "Claude <noreply@anthropic.com>"
         assert updated.git_commit_timestamp == "2025-12-15T12:30:00+00:00"
 
-    def test_associate_commit_minimal_fields(self, tmp_path):
+    def test_associate_commit_minimal_fields(self, writer):
         """Test commit association with only required fields."""
-        db_path = tmp_path / "test.sqlite"
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert a run
         record = RunRecord(
             run_id="test-run-123",
@@ -272,13 +264,8 @@ class TestDatabaseWriterAssociateCommit:
         assert updated.git_commit_author is None
         assert updated.git_commit_timestamp is None
 
-    def test_associate_commit_invalid_source(self, tmp_path):
+    def test_associate_commit_invalid_source(self, writer):
         """Test commit association with invalid source is rejected."""
-        db_path = tmp_path / "test.sqlite"
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert a run
         record = RunRecord(
             run_id="test-run-123",
@@ -300,13 +287,8 @@ class TestDatabaseWriterAssociateCommit:
         assert success is False
         assert "Invalid commit_source" in message
 
-    def test_associate_commit_invalid_hash_format(self, tmp_path):
+    def test_associate_commit_invalid_hash_format(self, writer):
         """Test commit association with invalid hash format is rejected."""
-        db_path = tmp_path / "test.sqlite"
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Insert a run
         record = RunRecord(
             run_id="test-run-123",
@@ -328,13 +310,8 @@ class TestDatabaseWriterAssociateCommit:
         assert success is False
         assert "Invalid commit_hash" in message
 
-    def test_associate_commit_missing_run(self, tmp_path):
+    def test_associate_commit_missing_run(self, writer):
         """Test commit association with non-existent run is rejected."""
-        db_path = tmp_path / "test.sqlite"
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         # Try to associate commit to non-existent run
         success, message = writer.associate_commit(
             run_id="nonexistent-run-id",
@@ -345,27 +322,26 @@ class TestDatabaseWriterAssociateCommit:
         assert success is False
         assert "Run not found" in message
 
-    def test_associate_commit_all_valid_sources(self, tmp_path):
+    def test_associate_commit_all_valid_sources(self, writer):
         """Test all valid commit_source values work."""
-        db_path = tmp_path / "test.sqlite"
-        create_schema(str(db_path))
-
-        writer = DatabaseWriter(db_path)
-
         valid_sources = ["manual", "llm", "ci"]
 
-        for i, source in enumerate(valid_sources):
-            # Insert a run
-            run_id = f"test-run-{i}"
-            record = RunRecord(
-                run_id=run_id,
+        # Insert one run per source in a single transaction
+        success, message = writer.insert_runs_bulk([
+            RunRecord(
+                run_id=f"test-run-{i}",
                 agent_name="test_agent",
                 job_type="test_job",
                 trigger_type="cli",
                 start_time=get_iso8601_timestamp(),
                 status="success",
             )
-            writer.insert_run(record)
+            for i in range(len(valid_sources))
+        ])
+        assert success is True, message
+
+        for i, source in enumerate(valid_sources):
+            run_id = f"test-run-{i}"
 
             # Associate commit with valid source
             success, message = writer.associate_commit(
@@ -391,11 +367,9 @@ class TestTelemetryClientAssociateCommit:
 
     def test_client_associate_commit_signature(self):
         """Test TelemetryClient.associate_commit has correct signature."""
-        import inspect
         from telemetry.client import TelemetryClient
 
-        sig = inspect.signature(TelemetryClient.associate_commit)
-        params = list(sig.parameters.keys())
+        params = list(inspect.signature(TelemetryClient.associate_commit).parameters.keys())
 
         assert "self" in params
         assert "run_id" in params
@@ -404,7 +378,7 @@ class TestTelemetryClientAssociateCommit:
         assert "commit_author" in params
         assert "commit_timestamp" in params
 
-    def test_client_associate_commit_integration(self, tmp_path):
+    def test_client_associate_commit_integration(self, tmp_path, schema_template):
         """Test full client integration with associate_commit."""
         from telemetry.client import TelemetryClient
         from telemetry.config import TelemetryConfig
@@ -413,7 +387,7 @@ class TestTelemetryClientAssociateCommit:
         db_path = tmp_path / "test.sqlite"
         ndjson_dir = tmp_path / "ndjson"
         ndjson_dir.mkdir()
-        create_schema(str(db_path))
+        fast_create(db_path, schema_template)
 
         config = TelemetryConfig(
             metrics_dir=tmp_path,
@@ -449,6 +423,26 @@ class TestTelemetryClientAssociateCommit:
         assert record.git_commit_source == "llm"
 
 
+# Minimal v3 schema (without git commit fields); executescript commits it
+V3_DDL = """
+    CREATE TABLE agent_runs (
+        run_id TEXT PRIMARY KEY,
+        schema_version INTEGER DEFAULT 3,
+        agent_name TEXT NOT NULL,
+        start_time TEXT NOT NULL,
+        status TEXT,
+        product_family TEXT,
+        subdomain TEXT
+    );
+    CREATE TABLE schema_migrations (
+        version INTEGER PRIMARY KEY,
+        applied_at TEXT,
+        description TEXT
+    );
+    INSERT INTO schema_migrations (version, description) VALUES (3, 'v3');
+"""
+
+
 class TestMigrationV3ToV4:
     """Test v3 to v4 migration script."""
 
@@ -459,48 +453,16 @@ class TestMigrationV3ToV4:
 
     def test_migration_function_importable(self):
         """Test migration function can be imported."""
-        sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
-        from migrate_v3_to_v4 import migrate_v3_to_v4
-
-        assert callable(migrate_v3_to_v4)
+        assert callable(migrate_v3_to_v4), "migrate_v3_to_v4 should be importable"
 
     def test_migration_adds_columns(self, tmp_path):
         """Test migration adds git commit columns to v3 database."""
-        sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
-        from migrate_v3_to_v4 import migrate_v3_to_v4
+        assert callable(migrate_v3_to_v4), "migrate_v3_to_v4 should be importable"
 
         # Create a v3 database
         db_path = tmp_path / "v3.sqlite"
         conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-
-        # Create minimal v3 schema (without git commit fields)
-        cursor.execute(
-            """
-            CREATE TABLE agent_runs (
-                run_id TEXT PRIMARY KEY,
-                schema_version INTEGER DEFAULT 3,
-                agent_name TEXT NOT NULL,
-                start_time TEXT NOT NULL,
-                status TEXT,
-                product_family TEXT,
-                subdomain TEXT
-            )
-        """
-        )
-        cursor.execute(
-            """
-            CREATE TABLE schema_migrations (
-                version INTEGER PRIMARY KEY,
-                applied_at TEXT,
-                description TEXT
-            )
-        """
-        )
-        cursor.execute(
-            "INSERT INTO schema_migrations (version, description) VALUES (3, 'v3')"
-        )
-        conn.commit()
+        conn.executescript(V3_DDL)
         conn.close()
 
         # Run migration
@@ -509,11 +471,8 @@ class TestMigrationV3ToV4:
         assert success is True
 
         # Verify columns added
-        conn = sqlite3.connect(str(db_path))
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(agent_runs)")
-        columns = {row[1] for row in cursor.fetchall()}
-        conn.close()
+        with closing(sqlite3.connect(str(db_path))) as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(agent_runs)")}
 
         assert "git_commit_hash" in columns
         assert "git_commit_source" in columns
@@ -11,14 +11,54 @@ Tests cover:
 - Edge cases (detached HEAD, missing remote, etc.)
 """
 
+import os
 import pytest
 import subprocess
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
+from types import SimpleNamespace
 
+from src.telemetry import git_detector
 from src.telemetry.git_detector import GitDetector
 
 
+def make_git_mock(url="https://github.com/user/test-repo.git", branch="main",
+                  git_dir=".git", url_rc=0):
+    """
+    Build a subprocess.run side_effect that answers the detector's git commands.
+
+    Each command is matched on a distinctive argument via a small lookup
+    table; anything else succeeds with empty output. The detector only reads
+    returncode and stdout, so the results are plain namespaces built once.
+    """
+    table = {
+        "--git-dir": SimpleNamespace(returncode=0, stdout=f"{git_dir}\n{branch}\n".encode(), stderr=b""),
+        "remote.origin.url": SimpleNamespace(
+            returncode=url_rc, stdout=f"{url}\n".encode() if url_rc == 0 else b"", stderr=b""
+        ),
+    }
+    default = SimpleNamespace(returncode=0, stdout=b"", stderr=b"")
+
+    def mock_git_command(cmd, **kwargs):
+        return next((result for key, result in table.items() if key in cmd), default)
+
+    return mock_git_command
+
+
+@pytest.fixture(autouse=True)
+def clear_shared_git_cache():
+    """Reset the process-wide detection cache so mocked results don't leak between tests."""
+    git_detector._shared_contexts.clear()
+    yield
+    git_detector._shared_contexts.clear()
+
+
+@pytest.fixture(autouse=True)
+def subprocess_detection(monkeypatch):
+    """Force the git subprocess path (which these tests mock) even if pygit2 is installed."""
+    monkeypatch.setattr(git_detector, "HAS_PYGIT2", False)
+
+
 class TestGitDetectorBasicDetection:
     """Test basic Git context detection functionality."""
 
@@ -28,26 +68,7 @@ class TestGitDetectorBasicDetection:
 
         # Mock subprocess calls to simulate Git repo
         with patch('subprocess.run') as mock_run:
-            # Setup mock responses for Git commands
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-                mock_result.returncode = 0
-
-                if '--git-dir' in cmd:
-                    # git rev-parse --git-dir
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    # git config --get remote.origin.url
-                    mock_result.stdout = "https://github.com/user/local-telemetry.git\n"
-                elif '--abbrev-ref' in cmd:
-                    # git rev-parse --abbrev-ref HEAD
-                    mock_result.stdout = "main\n"
-                else:
-                    mock_result.stdout = ""
-
-                return mock_result
-
-            mock_run.side_effect = mock_git_command
+            mock_run.side_effect = make_git_mock(url="https://github.com/user/local-telemetry.git")
 
             # Execute
             context = detector.get_git_context()
@@ -66,6 +87,7 @@ class TestGitDetectorBasicDetection:
         with patch('subprocess.run') as mock_run:
             mock_result = Mock()
             mock_result.returncode = 128  # Git error code for not a repo
+            mock_result.stdout = b""
             mock_run.return_value = mock_result
 
             # Execute
@@ -79,22 +101,7 @@ class TestGitDetectorBasicDetection:
         detector = GitDetector()
 
         with patch('subprocess.run') as mock_run:
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-                mock_result.returncode = 0
-
-                if '--git-dir' in cmd:
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    mock_result.stdout = "git@github.com:user/my-repo.git\n"
-                elif '--abbrev-ref' in cmd:
-                    mock_result.stdout = "develop\n"
-                else:
-                    mock_result.stdout = ""
-
-                return mock_result
-
-            mock_run.side_effect = mock_git_command
+            mock_run.side_effect = make_git_mock(url="git@github.com:user/my-repo.git", branch="develop")
 
             context = detector.get_git_context()
 
@@ -111,23 +118,7 @@ class TestGitDetectorCaching:
         detector = GitDetector()
 
         with patch('subprocess.run') as mock_run:
-            # Setup first call
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-                mock_result.returncode = 0
-
-                if '--git-dir' in cmd:
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    mock_result.stdout = "https://github.com/user/test-repo.git\n"
-                elif '--abbrev-ref' in cmd:
-                    mock_result.stdout = "main\n"
-                else:
-                    mock_result.stdout = ""
-
-                return mock_result
-
-            mock_run.side_effect = mock_git_command
+            mock_run.side_effect = make_git_mock()
 
             # First call - should trigger subprocess
             context1 = detector.get_git_context()
@@ -141,30 +132,29 @@ class TestGitDetectorCaching:
             assert context1 == context2
             assert context1["git_repo"] == "test-repo"
 
-            # Verify no new subprocess calls on second call
+            # Verify one rev-parse plus one config call, none on second call
+            assert call_count_first == 2
             assert call_count_second == call_count_first
 
+    def test_new_detector_reuses_process_cache(self):
+        """Test a second detector for the same directory runs no git commands."""
+        with patch('subprocess.run') as mock_run:
+            mock_run.side_effect = make_git_mock()
+
+            context1 = GitDetector().get_git_context()
+            call_count_first = mock_run.call_count
+
+            context2 = GitDetector().get_git_context()
+
+            assert context2 == context1
+            assert mock_run.call_count == call_count_first
+
     def test_force_refresh_bypasses_cache(self):
         """Test force_refresh=True triggers new detection."""
         detector = GitDetector()
 
         with patch('subprocess.run') as mock_run:
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-                mock_result.returncode = 0
-
-                if '--git-dir' in cmd:
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    mock_result.stdout = "https://github.com/user/test-repo.git\n"
-                elif '--abbrev-ref' in cmd:
-                    mock_result.stdout = "main\n"
-                else:
-                    mock_result.stdout = ""
-
-                return mock_result
-
-            mock_run.side_effect = mock_git_command
+            mock_run.side_effect = make_git_mock()
 
             # First call
             context1 = detector.get_git_context()
@@ -180,27 +170,36 @@ class TestGitDetectorCaching:
             # Verify new subprocess calls were made
             assert call_count_second > call_count_first
 
-    def test_clear_cache_resets_detection(self):
-        """Test clear_cache() allows re-detection."""
-        detector = GitDetector()
+    def test_force_refresh_updates_process_cache(self):
+        """Test a forced refresh replaces the context other detectors get."""
+        with patch('subprocess.run') as mock_run:
+            mock_run.side_effect = make_git_mock(branch="main")
+            detector = GitDetector()
+            assert detector.get_git_context()["git_branch"] == "main"
+
+            mock_run.side_effect = make_git_mock(branch="feature")
+            assert detector.get_git_context(force_refresh=True)["git_branch"] == "feature"
+
+            assert GitDetector().get_git_context()["git_branch"] == "feature"
 
+    def test_no_state_key_is_not_cached_process_wide(self, tmp_path):
+        """Test detection without a .git fingerprint is repeated per detector."""
         with patch('subprocess.run') as mock_run:
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-                mock_result.returncode = 0
+            mock_run.side_effect = make_git_mock()
+
+            GitDetector(working_dir=str(tmp_path)).get_git_context()
+            call_count_first = mock_run.call_count
 
-                if '--git-dir' in cmd:
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    mock_result.stdout = "https://github.com/user/test-repo.git\n"
-                elif '--abbrev-ref' in cmd:
-                    mock_result.stdout = "main\n"
-                else:
-                    mock_result.stdout = ""
+            GitDetector(working_dir=str(tmp_path)).get_git_context()
 
-                return mock_result
+            assert mock_run.call_count == 2 * call_count_first
+
+    def test_clear_cache_resets_detection(self):
+        """Test clear_cache() allows re-detection."""
+        detector = GitDetector()
 
-            mock_run.side_effect = mock_git_command
+        with patch('subprocess.run') as mock_run:
+            mock_run.side_effect = make_git_mock()
 
             # First call
             detector.get_git_context()
@@ -217,6 +216,66 @@ class TestGitDetectorCaching:
             assert call_count_second > call_count_first
 
 
+class TestGitDetectorDiskCache:
+    """Test the optional on-disk cache shared across detector instances."""
+
+    @pytest.fixture
+    def fake_repo(self, tmp_path):
+        """Working directory with a minimal .git directory (HEAD + config)."""
+        repo = tmp_path / "repo"
+        git_dir = repo / ".git"
+        git_dir.mkdir(parents=True)
+        (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+        (git_dir / "config").write_text("[core]\n")
+        return repo
+
+    def test_disk_cache_survives_new_detector_instance(self, fake_repo, tmp_path):
+        """Test a second detector reads the cached context without running git."""
+        cache_dir = tmp_path / "metrics" / "cache"  # Parent not created yet, as in TelemetryClient
+
+        with patch('subprocess.run') as mock_run:
+            mock_run.side_effect = make_git_mock()
+            context1 = GitDetector(working_dir=str(fake_repo), cache_dir=cache_dir).get_git_context()
+            assert mock_run.call_count == 2
+
+        git_detector._shared_contexts.clear()  # Simulate a new process
+
+        with patch('subprocess.run') as mock_run:
+            context2 = GitDetector(working_dir=str(fake_repo), cache_dir=cache_dir).get_git_context()
+            assert mock_run.call_count == 0
+
+        assert context2 == context1
+        assert context2["git_run_tag"] == "test-repo/main"
+
+    def test_process_cache_checked_before_disk_cache(self, fake_repo, tmp_path):
+        """Test a second detector in the same process skips the disk cache file."""
+        cache_dir = tmp_path / "cache"
+
+        with patch('subprocess.run') as mock_run:
+            mock_run.side_effect = make_git_mock()
+            context1 = GitDetector(working_dir=str(fake_repo), cache_dir=cache_dir).get_git_context()
+
+        detector = GitDetector(working_dir=str(fake_repo), cache_dir=cache_dir)
+        with patch.object(detector, '_read_disk_cache') as mock_read:
+            assert detector.get_git_context() == context1
+            mock_read.assert_not_called()
+
+    def test_disk_cache_invalidated_when_head_changes(self, fake_repo, tmp_path):
+        """Test a new HEAD mtime (checkout, commit) forces re-detection."""
+        cache_dir = tmp_path / "cache"
+        head = fake_repo / ".git" / "HEAD"
+
+        with patch('subprocess.run') as mock_run:
+            mock_run.side_effect = make_git_mock()
+            GitDetector(working_dir=str(fake_repo), cache_dir=cache_dir).get_git_context()
+
+            stat = head.stat()
+            os.utime(head, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            GitDetector(working_dir=str(fake_repo), cache_dir=cache_dir).get_git_context()
+            assert mock_run.call_count == 4
+
+
 class TestGitDetectorErrorHandling:
     """Test error handling and fail-safe behavior."""
 
@@ -270,6 +329,7 @@ class TestGitDetectorErrorHandling:
             # First call - fails
             mock_result = Mock()
             mock_result.returncode = 128  # Not a git repo
+            mock_result.stdout = b""
             mock_run.return_value = mock_result
 
             # First call
@@ -314,23 +374,7 @@ class TestGitDetectorEdgeCases:
         detector = GitDetector()
 
         with patch('subprocess.run') as mock_run:
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-                mock_result.returncode = 0
-
-                if '--git-dir' in cmd:
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    mock_result.stdout = "https://github.com/user/test-repo.git\n"
-                elif '--abbrev-ref' in cmd:
-                    # Detached HEAD returns "HEAD"
-                    mock_result.stdout = "HEAD\n"
-                else:
-                    mock_result.stdout = ""
-
-                return mock_result
-
-            mock_run.side_effect = mock_git_command
+            mock_run.side_effect = make_git_mock(branch="HEAD")
 
             context = detector.get_git_context()
 
@@ -345,26 +389,7 @@ class TestGitDetectorEdgeCases:
         detector = GitDetector()
 
         with patch('subprocess.run') as mock_run:
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-
-                if '--git-dir' in cmd:
-                    mock_result.returncode = 0
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    # No remote configured
-                    mock_result.returncode = 1
-                    mock_result.stdout = ""
-                elif '--abbrev-ref' in cmd:
-                    mock_result.returncode = 0
-                    mock_result.stdout = "main\n"
-                else:
-                    mock_result.returncode = 0
-                    mock_result.stdout = ""
-
-                return mock_result
-
-            mock_run.side_effect = mock_git_command
+            mock_run.side_effect = make_git_mock(url_rc=1)
 
             context = detector.get_git_context()
 
@@ -378,23 +403,7 @@ class TestGitDetectorEdgeCases:
         detector = GitDetector()
 
         with patch('subprocess.run') as mock_run:
-            def mock_git_command(cmd, **kwargs):
-                mock_result = Mock()
-                mock_result.returncode = 0
-
-                if '--git-dir' in cmd:
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    # URL without .git suffix
-                    mock_result.stdout = "https://github.com/user/test-repo\n"
-                elif '--abbrev-ref' in cmd:
-                    mock_result.stdout = "main\n"
-                else:
-                    mock_result.stdout = ""
-
-                return mock_result
-
-            mock_run.side_effect = mock_git_command
+            mock_run.side_effect = make_git_mock(url="https://github.com/user/test-repo")
 
             context = detector.get_git_context()
 
@@ -407,26 +416,37 @@ class TestGitDetectorEdgeCases:
         detector = GitDetector(working_dir=custom_dir)
 
         with patch('subprocess.run') as mock_run:
-            def mock_git_command(cmd, **kwargs):
-                # Verify cwd is set correctly
-                assert kwargs.get('cwd') == custom_dir
+            mock_run.side_effect = make_git_mock()
 
-                mock_result = Mock()
-                mock_result.returncode = 0
+            context = detector.get_git_context()
 
-                if '--git-dir' in cmd:
-                    mock_result.stdout = ".git\n"
-                elif 'remote.origin.url' in cmd:
-                    mock_result.stdout = "https://github.com/user/test-repo.git\n"
-                elif '--abbrev-ref' in cmd:
-                    mock_result.stdout = "main\n"
-                else:
-                    mock_result.stdout = ""
+            # Verify cwd is set correctly
+            assert mock_run.call_count > 0
+            assert all(call.kwargs.get('cwd') == custom_dir for call in mock_run.call_args_list)
+            assert context["git_repo"] == "test-repo"
 
-                return mock_result
 
-            mock_run.side_effect = mock_git_command
+class TestGitDetectorPygit2:
+    """Test in-process detection through pygit2 (skipped when it isn't installed)."""
 
-            context = detector.get_git_context()
+    def test_detect_with_pygit2(self, tmp_path, monkeypatch):
+        """Test pygit2 reads repo, branch and remote without spawning git."""
+        pygit2 = pytest.importorskip("pygit2")
+        monkeypatch.setattr(git_detector, "HAS_PYGIT2", True)
 
-            assert context["git_repo"] == "test-repo"
+        repo = pygit2.init_repository(str(tmp_path / "repo"), initial_head="main")
+        signature = pygit2.Signature("Test", "test@example.com")
+        tree = repo.TreeBuilder().write()
+        repo.create_commit("HEAD", signature, signature, "initial", tree, [])
+        repo.remotes.create("origin", "https://github.com/user/pygit2-repo.git")
+
+        with patch('subprocess.run') as mock_run:
+            context = GitDetector(working_dir=str(tmp_path / "repo")).get_git_context()
+
+            assert mock_run.call_count == 0
+
+        assert context == {
+            "git_repo": "pygit2-repo",
+            "git_branch": "main",
+            "git_run_tag": "pygit2-repo/main",
+        }
@@ -12,7 +12,13 @@ Tests cover:
 
 import sys
 import json
+import enum
+import os
+import subprocess
 import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -20,7 +26,22 @@ from datetime import datetime, timezone
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 import pytest
-from telemetry.local import NDJSONWriter
+from telemetry import local
+from telemetry.local import BackgroundNDJSONWriter, NDJSONWriter
+
+
+class Status(str, enum.Enum):
+    DONE = "done"
+
+
+class Color(enum.Enum):
+    RED = 1
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
 
 
 class TestNDJSONWriterCreation:
@@ -95,6 +116,29 @@ class TestNDJSONAppend:
 
         assert len(lines) == 3
 
+    def test_append_many_writes_batch(self, tmp_path):
+        """Test append_many writes every record, in order, in one call."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        payloads = [{"run_id": f"test-{i}", "index": i} for i in range(50)]
+
+        success, message = writer.append_many(payloads)
+        assert success is True, message
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        assert writer.read_file(today) == payloads
+
+    def test_append_many_empty_batch(self, tmp_path):
+        """Test append_many with no records succeeds without creating a file."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        success, _ = writer.append_many([])
+
+        assert success is True
+        assert writer.list_files() == []
+
     def test_append_preserves_json_structure(self, tmp_path):
         """Test that appended records preserve JSON structure."""
         ndjson_dir = tmp_path / "ndjson"
@@ -144,6 +188,73 @@ class TestNDJSONAppend:
         restored = json.loads(line)
         assert restored["message"] == "Hello 世界 🌍"
 
+    def test_append_handles_big_int(self, tmp_path):
+        """Test appending an integer beyond 64 bits."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        success, _ = writer.append({"run_id": "test-123", "count": 2**70})
+        assert success is True
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        line = (ndjson_dir / f"events_{today}.ndjson").read_text(encoding="utf-8")
+        assert json.loads(line)["count"] == 2**70
+
+    def test_append_writes_nan_as_nan(self, tmp_path):
+        """Test that NaN and Infinity are written as the json module writes them."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        payload = {"run_id": "test-123", "ratio": float("nan"), "limit": [float("inf")]}
+        success, _ = writer.append(payload)
+        assert success is True
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        line = (ndjson_dir / f"events_{today}.ndjson").read_text(encoding="utf-8")
+        assert line == '{"run_id":"test-123","ratio":NaN,"limit":[Infinity]}\n'
+
+    def test_append_escapes_lone_surrogates(self, tmp_path):
+        """Test appending a string that has no UTF-8 encoding."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        success, _ = writer.append({"run_id": "test-123", "text": "bad \ud800"})
+        assert success is True
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        line = (ndjson_dir / f"events_{today}.ndjson").read_text(encoding="utf-8")
+        assert json.loads(line)["text"] == "bad \ud800"
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "plain",
+            {"nested": [1, 2.5, None, True]},
+            {1: "int key"},
+            Status.DONE,
+            datetime(2025, 1, 1, tzinfo=timezone.utc),
+            uuid.UUID(int=1),
+            Color.RED,
+            Point(1, 2),
+            {uuid.UUID(int=1): "uuid key"},
+            {Color.RED: "enum key"},
+        ],
+        ids=lambda value: type(value).__name__,
+    )
+    def test_orjson_and_json_paths_agree(self, value, monkeypatch):
+        """Test both serializers accept, reject and write payloads the same way."""
+        if not local.HAS_ORJSON:
+            pytest.skip("orjson not installed")
+
+        def dumps(has_orjson):
+            monkeypatch.setattr(local, "HAS_ORJSON", has_orjson)
+            try:
+                return local._dumps_line({"value": value})
+            except TypeError:
+                return TypeError
+
+        assert dumps(True) == dumps(False)
+
 
 class TestDailyRotation:
     """Test daily file rotation."""
@@ -174,6 +285,70 @@ class TestDailyRotation:
         assert file_path.name.startswith("events_")
         assert file_path.name.endswith(".ndjson")
 
+    def test_get_daily_file_rolls_over_at_utc_midnight(self, tmp_path, monkeypatch):
+        """Test the cached daily path changes exactly at UTC midnight."""
+        writer = NDJSONWriter(tmp_path / "ndjson")
+        midnight = datetime(2025, 1, 2, tzinfo=timezone.utc).timestamp()
+
+        monkeypatch.setattr("telemetry.local.time.time", lambda: midnight - 1)
+        assert writer._get_daily_file().name == "events_20250101.ndjson"
+
+        monkeypatch.setattr("telemetry.local.time.time", lambda: midnight)
+        assert writer._get_daily_file().name == "events_20250102.ndjson"
+
+    def test_append_switches_file_when_date_changes(self, tmp_path, monkeypatch):
+        """Test the cached file handle is swapped when the day rolls over."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        monkeypatch.setattr(writer, "_get_daily_file", lambda: ndjson_dir / "events_20250101.ndjson")
+        writer.append({"run_id": "day-1"})
+        monkeypatch.setattr(writer, "_get_daily_file", lambda: ndjson_dir / "events_20250102.ndjson")
+        writer.append({"run_id": "day-2"})
+        writer.close()
+
+        assert writer.read_file("20250101") == [{"run_id": "day-1"}]
+        assert writer.read_file("20250102") == [{"run_id": "day-2"}]
+
+    def test_rollover_evicts_previous_file_from_page_cache(self, tmp_path, monkeypatch):
+        """Test the finished day's file is advised DONTNEED when the date changes."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        advised = []
+        monkeypatch.setattr(
+            "telemetry.local.os.posix_fadvise",
+            lambda fd, offset, length, advice: advised.append(advice),
+            raising=False,
+        )
+        monkeypatch.setattr("telemetry.local.os.POSIX_FADV_DONTNEED", 4, raising=False)
+
+        monkeypatch.setattr(writer, "_get_daily_file", lambda: ndjson_dir / "events_20250101.ndjson")
+        writer.append({"run_id": "day-1"})
+        writer.append({"run_id": "day-1-again"})
+        assert advised == []
+
+        monkeypatch.setattr(writer, "_get_daily_file", lambda: ndjson_dir / "events_20250102.ndjson")
+        writer.append({"run_id": "day-2"})
+        writer.close()
+
+        assert advised == [4]
+
+    def test_append_recreates_removed_file(self, tmp_path):
+        """Test appends after the daily file is removed go to a new file."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        writer.append({"run_id": "before"})
+        file_path = writer._get_daily_file()
+        file_path.unlink()
+
+        writer.append({"run_id": "after"})
+        writer.close()
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        assert writer.read_file(today) == [{"run_id": "after"}]
+
 
 class TestReadingFiles:
     """Test reading NDJSON files."""
@@ -229,6 +404,17 @@ class TestReadingFiles:
         # Should only get 2 records, empty lines ignored
         assert len(records) == 2
 
+    def test_read_file_empty_file(self, tmp_path):
+        """Test that reading an empty file returns no records."""
+        ndjson_dir = tmp_path / "ndjson"
+        ndjson_dir.mkdir(parents=True, exist_ok=True)
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        (ndjson_dir / f"events_{today}.ndjson").touch()
+
+        writer = NDJSONWriter(ndjson_dir)
+        assert writer.read_file(today) == []
+
     def test_read_file_handles_invalid_json(self, tmp_path):
         """Test that read_file handles invalid JSON gracefully."""
         ndjson_dir = tmp_path / "ndjson"
@@ -249,6 +435,59 @@ class TestReadingFiles:
         # Should get 2 valid records, invalid line skipped
         assert len(records) == 2
 
+    def test_read_file_does_not_merge_partial_lines(self, tmp_path):
+        """Test that records split across lines are not stitched together."""
+        ndjson_dir = tmp_path / "ndjson"
+        ndjson_dir.mkdir(parents=True, exist_ok=True)
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        file_path = ndjson_dir / f"events_{today}.ndjson"
+
+        with open(file_path, "w") as f:
+            f.write('{"run_id": "test-1"}, {"run_id": "test-2"}\n')
+            f.write('{"run_id": "test-3"\n')
+            f.write('}\n')
+            f.write('{"run_id": "test-4"}\n')
+
+        writer = NDJSONWriter(ndjson_dir)
+        records = writer.read_file(today)
+
+        assert records == [{"run_id": "test-4"}]
+
+    def test_read_file_does_not_join_invalid_lines(self, tmp_path):
+        """Test that invalid lines never combine into a record."""
+        ndjson_dir = tmp_path / "ndjson"
+        ndjson_dir.mkdir(parents=True, exist_ok=True)
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        file_path = ndjson_dir / f"events_{today}.ndjson"
+
+        with open(file_path, "w") as f:
+            f.write('{"a": 1}, {"b": 2}\n')
+            f.write('{"c": "x"\n')
+            f.write('"y": 1}\n')
+
+        writer = NDJSONWriter(ndjson_dir)
+        records = writer.read_file(today)
+
+        assert records == []
+
+    def test_read_file_round_trips_nan_and_big_int(self, tmp_path):
+        """Test that values only the json module handles are read back exactly."""
+        ndjson_dir = tmp_path / "ndjson"
+        writer = NDJSONWriter(ndjson_dir)
+
+        writer.append({"run_id": "test-1", "ratio": float("nan")})
+        writer.append({"run_id": "test-2", "count": 2**70})
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        records = writer.read_file(today)
+
+        assert len(records) == 2
+        assert records[0]["ratio"] != records[0]["ratio"]  # NaN
+        assert records[1]["count"] == 2**70
+        assert isinstance(records[1]["count"], int)
+
 
 class TestFileManagement:
     """Test file listing and info functions."""
@@ -315,6 +554,30 @@ class TestFileManagement:
         assert info["line_count"] == 5
         assert info["path"] == str(file_path)
 
+    def test_get_file_info_skips_blank_lines(self, tmp_path):
+        """Test line_count ignores blank lines and counts an unterminated last line."""
+        ndjson_dir = tmp_path / "ndjson"
+        ndjson_dir.mkdir(parents=True, exist_ok=True)
+        file_path = ndjson_dir / "events_20250101.ndjson"
+        file_path.write_bytes(b'\n{"a": 1}\r\n  \n\t\r\n{"b": 2}\n\n{"c": 3}')
+
+        writer = NDJSONWriter(ndjson_dir)
+
+        assert writer.get_file_info(file_path)["line_count"] == 3
+
+    def test_get_file_info_matches_read_file_across_chunks(self, tmp_path, monkeypatch):
+        """Test line_count equals the records read_file parses when blank lines straddle chunks."""
+        monkeypatch.setattr(local, "_COUNT_CHUNK", 16)
+        ndjson_dir = tmp_path / "ndjson"
+        ndjson_dir.mkdir(parents=True, exist_ok=True)
+        file_path = ndjson_dir / "events_20250101.ndjson"
+        lines = [b'{"i": %d}' % i if i % 3 else b" \t" for i in range(40)]
+        file_path.write_bytes(b"\n".join(lines) + b"\n\n  ")
+
+        writer = NDJSONWriter(ndjson_dir)
+
+        assert writer.get_file_info(file_path)["line_count"] == len(writer.read_file("20250101"))
+
     def test_get_file_info_not_found(self, tmp_path):
         """Test getting info for non-existent file."""
         ndjson_dir = tmp_path / "ndjson"
@@ -345,6 +608,30 @@ class TestConcurrency:
         records = writer.read_file(today)
         assert len(records) == 100
 
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_forked_child_reopens_daily_file(self, tmp_path):
+        """Test a forked child does not append through the parent's file handle."""
+        writer = NDJSONWriter(tmp_path / "ndjson")
+        writer.append({"run_id": "parent-before"})
+        inherited = writer._file
+
+        pid = os.fork()
+        if pid == 0:
+            ok = writer.append({"run_id": "child"})[0] and writer._file is not inherited
+            os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.WEXITSTATUS(status) == 0
+
+        # The parent keeps its own handle open
+        writer.append({"run_id": "parent-after"})
+        assert writer._file is inherited
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        run_ids = [r["run_id"] for r in writer.read_file(today)]
+        assert run_ids == ["parent-before", "child", "parent-after"]
+        writer.close()
+
     def test_file_locking_availability(self):
         """Test that file locking modules are available."""
         import sys
@@ -404,3 +691,77 @@ class TestFileFlushing:
         with open(file_path, "r") as f:
             content = f.read()
             assert len(content) > 0
+
+
+class TestBackgroundWriter:
+    """Test BackgroundNDJSONWriter queued appends."""
+
+    def test_flush_writes_queued_records_in_order(self, tmp_path):
+        """Test flush() waits until every queued record is on disk."""
+        writer = BackgroundNDJSONWriter(tmp_path / "ndjson")
+
+        for i in range(100):
+            success, _ = writer.append({"run_id": f"test-{i}", "index": i})
+            assert success is True
+
+        assert writer.flush(timeout=5) is True
+        writer.close()
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        records = writer.read_file(today)
+        assert [r["index"] for r in records] == list(range(100))
+        assert writer.dropped == 0
+
+    def test_full_queue_drops_oldest(self, tmp_path, monkeypatch):
+        """Test a full queue drops the oldest queued records and counts them."""
+        writer = BackgroundNDJSONWriter(tmp_path / "ndjson", max_pending=3)
+
+        # Hold the worker inside its first write so later appends queue up
+        entered, release = threading.Event(), threading.Event()
+        write_data = writer._write_data
+
+        def blocked_write(data):
+            entered.set()
+            release.wait(5)
+            return write_data(data)
+
+        monkeypatch.setattr(writer, "_write_data", blocked_write)
+
+        writer.append({"index": 0})
+        assert entered.wait(5)
+        for i in range(1, 6):
+            writer.append({"index": i})
+
+        release.set()
+        assert writer.flush(timeout=5) is True
+        writer.close()
+
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        assert [r["index"] for r in writer.read_file(today)] == [0, 3, 4, 5]
+        assert writer.dropped == 2
+
+    def test_append_after_close_fails(self, tmp_path):
+        """Test appends are rejected once the writer is closed."""
+        writer = BackgroundNDJSONWriter(tmp_path / "ndjson")
+        writer.close()
+
+        success, message = writer.append({"run_id": "late"})
+
+        assert success is False
+        assert "[FAIL]" in message
+
+    def test_unclosed_writer_flushes_at_exit(self, tmp_path):
+        """Test queued records are written at interpreter exit without close()."""
+        ndjson_dir = tmp_path / "ndjson"
+        script = (
+            "import sys\n"
+            f"sys.path.insert(0, {str(Path(__file__).parent.parent / 'src')!r})\n"
+            "from telemetry.local import BackgroundNDJSONWriter\n"
+            f"writer = BackgroundNDJSONWriter({str(ndjson_dir)!r})\n"
+            "writer.append_many([{'index': i} for i in range(50)])\n"
+        )
+
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=30)
+
+        records = NDJSONWriter(ndjson_dir).read_file(datetime.now(timezone.utc).strftime("%Y%m%d"))
+        assert [r["index"] for r in records] == list(range(50))
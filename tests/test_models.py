@@ -169,6 +169,22 @@ class TestRunRecord:
         assert data["schema_version"] == 1
         assert data["record_type"] == "run"
 
+    def test_run_record_to_dict_matches_asdict(self):
+        """Test to_dict keeps asdict's keys and field order."""
+        record = RunRecord(
+            run_id="test-run-123",
+            agent_name="test_agent",
+            job_type="test_job",
+            trigger_type="cli",
+            start_time=get_iso8601_timestamp(),
+            metrics_json='{"pages": 3}',
+        )
+
+        data = record.to_dict()
+        expected = asdict(record)
+        expected["record_type"] = "run"
+        assert list(data.items()) == list(expected.items())
+
     def test_run_record_from_dict(self):
         """Test RunRecord from_dict deserialization."""
         data = {